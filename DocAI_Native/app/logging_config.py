@@ -3,6 +3,7 @@ Structured logging configuration with rotation
 Enterprise-grade logging setup
 """
 
+import os
 import logging
 import logging.handlers
 import sys
@@ -82,6 +83,56 @@ def setup_logging():
     return logger
 
 
+class RawAppendHandler(logging.Handler):
+    """Size-rotated file handler that appends each record with one os.write"""
+    
+    def __init__(self, filename, max_bytes=0, backup_count=0):
+        super().__init__()
+        self.filename = os.fspath(filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._fd = None
+        self._size = 0
+        self._open()
+    
+    def _open(self):
+        """Open the log file for atomic appends"""
+        self._fd = os.open(self.filename, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = os.fstat(self._fd).st_size
+    
+    def emit(self, record):
+        """Write a formatted record (called with the handler lock held)"""
+        try:
+            data = (self.format(record) + '\n').encode('utf-8')
+            os.write(self._fd, data)
+            self._size += len(data)
+            if self.max_bytes and self.backup_count and self._size >= self.max_bytes:
+                self._rotate()
+        except Exception:
+            self.handleError(record)
+    
+    def _rotate(self):
+        """Shift backups up by one and start a fresh file"""
+        os.close(self._fd)
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.filename}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.filename}.{i + 1}")
+        os.replace(self.filename, f"{self.filename}.1")
+        self._open()
+    
+    def close(self):
+        """Close the file descriptor"""
+        self.acquire()
+        try:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        finally:
+            self.release()
+        super().close()
+
+
 def log_request_info(func):
     """Decorator to log request information"""
     def wrapper(*args, **kwargs):
@@ -8,9 +8,10 @@ import subprocess
 import logging
 import time
 import os
+import functools
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,10 @@ class DocumentEmbedder(ABC):
     def can_embed(self) -> bool:
         """Check if embedding is supported on this platform"""
         pass
+    
+    def close_documents(self):
+        """Close documents the embedder still holds open"""
+        pass
 
 
 class LinuxDocumentEmbedder(DocumentEmbedder):
@@ -34,6 +39,8 @@ class LinuxDocumentEmbedder(DocumentEmbedder):
     
     def __init__(self):
         self.embedded_processes = {}
+        # Documents opened in the persistent listener, for later cleanup
+        self.loaded_documents = {}
         
     def can_embed(self) -> bool:
         """Check if X11 embedding is available"""
@@ -103,6 +110,22 @@ class LinuxDocumentEmbedder(DocumentEmbedder):
                     'error': f'Document not found: {document_path}'
                 }
             
+            # Prefer the persistent listener, avoiding a soffice cold start.
+            # It opens the document in its own frame, not in the parent window
+            from app.services.libreoffice_pool import get_libreoffice_pool
+            pool = get_libreoffice_pool()
+            if pool:
+                # Re-opening loads a fresh copy; close the old one first
+                previous = self.loaded_documents.pop(document_path, None)
+                if previous is not None:
+                    previous.close()
+                result = pool.load_document(document_path)
+                if result['success']:
+                    self.loaded_documents[document_path] = result.pop('document')
+                    result['mode'] = 'separate'
+                    return result
+                logger.warning(f"Listener could not open document, starting viewer: {result['error']}")
+            
             # Get parent window ID
             window_id = self.get_window_id(parent_window)
             if not window_id:
@@ -182,6 +205,12 @@ class LinuxDocumentEmbedder(DocumentEmbedder):
                 'success': False,
                 'error': f'Failed to open document: {str(e)}'
             }
+    
+    def close_documents(self):
+        """Close every document opened in the persistent listener"""
+        while self.loaded_documents:
+            _, loaded_doc = self.loaded_documents.popitem()
+            loaded_doc.close()
 
 
 class WindowsDocumentEmbedder(DocumentEmbedder):
@@ -411,4 +440,23 @@ def get_document_embedder() -> DocumentEmbedder:
     global _embedder
     if _embedder is None:
         _embedder = create_document_embedder()
-    return _embedder
\ No newline at end of file
+    return _embedder
+
+
+def close_document_embedder():
+    """Close documents held by the global embedder, if one was created"""
+    if _embedder is not None:
+        _embedder.close_documents()
+
+
+@functools.lru_cache(maxsize=None)
+def probe_libreoffice() -> Tuple[bool, str]:
+    """
+    Check embedding support once and cache the result.
+    
+    Returns:
+        (available, embedder class name); call probe_libreoffice.cache_clear()
+        to force a re-probe
+    """
+    embedder = get_document_embedder()
+    return embedder.can_embed(), embedder.__class__.__name__
\ No newline at end of file
@@ -0,0 +1,465 @@
+"""
+LibreOffice Listener Pool
+Keeps long-lived soffice processes accepting UNO connections so documents
+open without paying the LibreOffice cold start on every request
+"""
+
+import os
+import shutil
+import socket
+import logging
+import queue
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from config import CFG
+from uno_bridge import UNOConnection, DocumentLoader
+
+logger = logging.getLogger(__name__)
+
+
+def find_soffice() -> Optional[str]:
+    """Locate the soffice executable, preferring the one on PATH"""
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    if os.path.exists(CFG.LIBREOFFICE_PATH):
+        return CFG.LIBREOFFICE_PATH
+    return None
+
+
+def _find_free_port(host: str) -> int:
+    """Let the OS pick a free port on host"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # Ports left in TIME_WAIT by a failed attempt stay usable
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def _is_port_in_use(host: str, port: int) -> bool:
+    """Check if port is in use on host"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        # A TIME_WAIT leftover does not count as in use
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, port))
+            return False
+        except OSError:
+            return True
+
+
+class LibreOfficeWorker:
+    """One soffice listener bound to its own port and user profile"""
+
+    PID_FILE = 'listener.pid'   # In the profile, so the next run can stop an orphan
+
+    def __init__(self, port: int, profile_dir: Path, host: str = '127.0.0.1',
+                 env: Optional[Dict[str, str]] = None):
+        self.requested_port = port   # 0 picks a free port on every start
+        self.port = port
+        self.host = host
+        self.profile_dir = Path(profile_dir)
+        self.env = env
+        self.process = None
+        self.connection = None
+        self.document_loader = None
+        self.lock = threading.Lock()
+
+    def build_command(self, soffice: str) -> list:
+        """Build the soffice command line for this worker"""
+        # --invisible rather than --headless: documents loaded with
+        # Hidden=False still need a real frame for the viewer
+        return [
+            soffice,
+            '--invisible',
+            '--norestore',
+            '--nologo',
+            '--nofirststartwizard',
+            '--nolockcheck',
+            f'-env:UserInstallation={self.profile_dir.as_uri()}',
+            f'--accept=socket,host={self.host},port={self.port};urp;'
+        ]
+
+    def start(self, timeout: float = CFG.UNO_TIMEOUT,
+              stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Launch soffice and wait until its UNO socket accepts connections
+        
+        Setting stop_event abandons the wait and stops the process
+        """
+        soffice = find_soffice()
+        if not soffice:
+            logger.error("LibreOffice executable not found")
+            return False
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        # A listener that outlived a crashed run owns this profile; a new
+        # soffice would hand off to it over the profile's pipe and exit
+        self._kill_leftover()
+        self._choose_port()
+        cmd = self.build_command(soffice)
+        logger.info("Starting LibreOffice listener on port %d", self.port)
+        logger.debug("Listener command: %s", cmd)
+
+        self.process = subprocess.Popen(
+            cmd,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        self._pid_file.write_text(str(self.process.pid))
+        self.connection = None
+        self.document_loader = None
+
+        if not self._wait_for_port(timeout, stop_event):
+            if stop_event is None or not stop_event.is_set():
+                logger.error("LibreOffice listener on port %d did not come up", self.port)
+            self.stop()
+            return False
+
+        logger.info("LibreOffice listener ready on port %d (pid %d)", self.port, self.process.pid)
+        return True
+
+    @property
+    def _pid_file(self) -> Path:
+        return self.profile_dir / self.PID_FILE
+
+    def _choose_port(self):
+        """Pick the port for the next start, avoiding one another program holds"""
+        if not self.requested_port:
+            self.port = _find_free_port(self.host)
+        elif _is_port_in_use(self.host, self.requested_port):
+            self.port = _find_free_port(self.host)
+            logger.warning("Port %d is in use, LibreOffice listener using port %d instead",
+                           self.requested_port, self.port)
+        else:
+            self.port = self.requested_port
+
+    def _kill_leftover(self):
+        """Stop a listener recorded in the profile's pid file by an earlier run"""
+        try:
+            pid = int(self._pid_file.read_text().strip())
+        except (OSError, ValueError):
+            return
+        self._pid_file.unlink(missing_ok=True)
+
+        # The listener leads its own process group, and Linux does not reuse
+        # a pid while its group exists. Only a live leader needs checking
+        # against this profile in case the pid was reused
+        try:
+            cmdline = Path(f'/proc/{pid}/cmdline').read_bytes()
+            if self.profile_dir.as_uri().encode() not in cmdline:
+                return
+        except OSError:
+            pass
+
+        try:
+            os.killpg(pid, signal.SIGTERM)
+            logger.warning("Stopping leftover LibreOffice listener (pid %d) on %s",
+                           pid, self.profile_dir)
+            deadline = time.monotonic() + CFG.SHUTDOWN_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(0.1)
+                os.killpg(pid, 0)
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        except OSError as e:
+            logger.error("Could not stop leftover LibreOffice listener (pid %d): %s", pid, e)
+
+    def _wait_for_port(self, timeout: float,
+                       stop_event: Optional[threading.Event] = None) -> bool:
+        """Poll the accept socket until it is reachable, soffice exits or stop_event is set"""
+        stop_event = stop_event or threading.Event()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                return False
+            try:
+                socket.create_connection((self.host, self.port), timeout=0.1).close()
+                return True
+            except OSError:
+                if stop_event.wait(0.1):
+                    return False
+        return False
+
+    def is_alive(self) -> bool:
+        """Check whether the soffice process is still running"""
+        return self.process is not None and self.process.poll() is None
+
+    def connect(self) -> bool:
+        """Connect to the listener's desktop, reusing an existing connection"""
+        if self.document_loader is not None:
+            return True
+
+        connection = UNOConnection(host=self.host, port=self.port)
+        if not connection.connect():
+            return False
+
+        self.connection = connection
+        self.document_loader = DocumentLoader(connection.desktop)
+        return True
+
+    def load_document(self, file_path: str, hidden: bool = False):
+        """Load a document into the running instance via loadComponentFromURL"""
+        if not self.connect():
+            raise RuntimeError(f"Could not connect to LibreOffice on port {self.port}")
+        return self.document_loader.load_document(file_path, hidden=hidden)
+
+    def stop(self):
+        """Terminate the soffice process"""
+        if self.connection:
+            self.connection.disconnect()
+        self.connection = None
+        self.document_loader = None
+
+        if self.process:
+            try:
+                self.process.terminate()
+                self.process.wait(timeout=CFG.SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            except Exception as e:
+                logger.error("Error stopping LibreOffice listener: %s", e)
+            finally:
+                self.process = None
+                self._pid_file.unlink(missing_ok=True)
+
+
+class LibreOfficePool:
+    """
+    Persistent LibreOffice listeners with a watchdog that restarts them on crash.
+    
+    Each worker gets its own port and user profile, since soffice instances
+    sharing a profile hand their work to the first one and exit. Idle workers
+    wait in a queue so concurrent loads run on separate processes.
+    """
+
+    WATCHDOG_INTERVAL = 2.0
+    RESTART_BACKOFF_MAX = 60.0   # Longest wait between restarts of a failing listener
+    MAX_RESTART_FAILURES = 5     # Consecutive failed restarts before a listener is dropped
+
+    def __init__(self, size: int = CFG.LIBREOFFICE_POOL_SIZE,
+                 base_port: int = CFG.LIBREOFFICE_POOL_PORT, profile_root: Path = None):
+        profile_root = Path(profile_root or CFG.CACHE_DIR)
+        self.workers = [
+            LibreOfficeWorker(base_port + i if base_port else 0, profile_root / f'lo_profile_{i}')
+            for i in range(max(1, size))
+        ]
+        self._idle = queue.Queue()
+        # Consecutive failed starts and next restart time, per worker
+        self._restart_failures = {worker: 0 for worker in self.workers}
+        self._restart_at = {worker: 0.0 for worker in self.workers}
+        self._stop_event = threading.Event()
+        self._watchdog_thread = None
+
+    def start(self) -> bool:
+        """
+        Start the listeners in parallel, then the watchdog; True if any came up
+        
+        A shutdown() from another thread cancels a start in progress.
+        """
+        if not find_soffice():
+            logger.error("LibreOffice executable not found, pool disabled")
+            return False
+
+        threads = [
+            threading.Thread(
+                target=self._start_worker,
+                args=(worker,),
+                daemon=True,
+                name=f"LibreOfficeStart-{i}"
+            )
+            for i, worker in enumerate(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._stop_event.is_set():
+            logger.info("LibreOffice pool start cancelled")
+            return False
+
+        started = sum(1 for worker in self.workers if worker.is_alive())
+        self._watchdog_thread = threading.Thread(
+            target=self._watchdog,
+            daemon=True,
+            name="LibreOfficeWatchdog"
+        )
+        self._watchdog_thread.start()
+        logger.info("LibreOffice pool started %d/%d listeners", started, len(self.workers))
+        return started > 0
+
+    def _start_worker(self, worker: LibreOfficeWorker):
+        """Start one listener and queue it for loads"""
+        with worker.lock:
+            if self._stop_event.is_set():
+                return
+            try:
+                started = worker.start(stop_event=self._stop_event)
+            except Exception as e:
+                logger.error("Failed to start LibreOffice listener: %s", e)
+                started = False
+            if not started and not self._stop_event.is_set():
+                self._record_restart_failure(worker)
+        self._idle.put(worker)
+
+    def _record_restart_failure(self, worker: LibreOfficeWorker):
+        """Back off exponentially before the next restart of a failing listener"""
+        failures = self._restart_failures[worker] + 1
+        self._restart_failures[worker] = failures
+        if failures >= self.MAX_RESTART_FAILURES:
+            logger.error("LibreOffice listener on port %d failed %d times, giving up",
+                         worker.port, failures)
+            return
+        delay = min(self.WATCHDOG_INTERVAL * 2 ** failures, self.RESTART_BACKOFF_MAX)
+        self._restart_at[worker] = time.monotonic() + delay
+
+    def _watchdog(self):
+        """Restart any listener whose process has died, backing off on repeated failures"""
+        while not self._stop_event.wait(self.WATCHDOG_INTERVAL):
+            pending = 0
+            for worker in self.workers:
+                if worker.is_alive():
+                    continue
+                if self._restart_failures[worker] >= self.MAX_RESTART_FAILURES:
+                    continue
+                pending += 1
+                if time.monotonic() < self._restart_at[worker]:
+                    continue
+                logger.warning("LibreOffice listener on port %d is down, restarting", worker.port)
+                with worker.lock:
+                    if self._stop_event.is_set():
+                        return
+                    try:
+                        worker.stop()
+                        started = worker.start(stop_event=self._stop_event)
+                    except Exception as e:
+                        logger.error("Failed to restart LibreOffice listener: %s", e)
+                        started = False
+                if started:
+                    self._restart_failures[worker] = 0
+                else:
+                    self._record_restart_failure(worker)
+
+            # Every listener is up or dropped; a dead one stays dropped
+            if not pending and not any(worker.is_alive() for worker in self.workers):
+                logger.error("No LibreOffice listener left, watchdog stopping")
+                return
+
+    def _acquire_worker(self, timeout: float) -> Optional[LibreOfficeWorker]:
+        """Take a running worker off the idle queue, requeueing dead ones"""
+        # Nothing to wait for when no listener is running
+        if not any(worker.is_alive() for worker in self.workers):
+            return None
+
+        for _ in range(len(self.workers)):
+            try:
+                worker = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                return None
+            if worker.is_alive():
+                return worker
+            self._idle.put(worker)
+        return None
+
+    def load_document(self, file_path: str, hidden: bool = False) -> Dict[str, Any]:
+        """
+        Open a document in one of the persistent instances
+        
+        On success the result's 'document' is the LoadedDocument, which the
+        caller keeps to close the document later
+        """
+        worker = self._acquire_worker(CFG.UNO_TIMEOUT)
+        if worker is None:
+            return {'success': False, 'error': 'No LibreOffice listener available'}
+
+        try:
+            with worker.lock:
+                loaded_doc = worker.load_document(file_path, hidden=hidden)
+                pid = worker.process.pid
+
+            return {
+                'success': True,
+                'doc_id': loaded_doc.doc_id,
+                'pid': pid,
+                'port': worker.port,
+                'document': loaded_doc,
+                'mode': 'listener',
+                'message': 'Document opened in running LibreOffice instance'
+            }
+        except Exception as e:
+            logger.error("Listener on port %d failed to load %s: %s", worker.port, file_path, e)
+            return {'success': False, 'error': str(e)}
+        finally:
+            self._idle.put(worker)
+
+    def shutdown(self):
+        """Stop the watchdog and all listeners"""
+        self._stop_event.set()
+        if self._watchdog_thread:
+            self._watchdog_thread.join(timeout=CFG.SHUTDOWN_TIMEOUT)
+            self._watchdog_thread = None
+        for worker in self.workers:
+            with worker.lock:
+                worker.stop()
+        logger.info("LibreOffice pool shut down")
+
+
+# Global pool instance
+_pool = None
+_starting_pool = None   # Pool whose start() is running, so shutdown can cancel it
+_pool_failed = False
+_pool_lock = threading.Lock()
+
+
+def start_libreoffice_pool() -> Optional[LibreOfficePool]:
+    """Create and start the global pool if it is not running yet; None if it failed"""
+    global _pool, _starting_pool, _pool_failed
+    with _pool_lock:
+        if _pool is not None or _starting_pool is not None or _pool_failed:
+            return _pool
+        pool = _starting_pool = LibreOfficePool()
+
+    # Listeners take seconds to come up; start without the lock held so
+    # shutdown_libreoffice_pool() can cancel instead of waiting behind it
+    started = pool.start()
+
+    with _pool_lock:
+        cancelled = _starting_pool is not pool
+        _starting_pool = None
+        if started and not cancelled:
+            _pool = pool
+            return _pool
+        if not cancelled:
+            # Don't retry on every request; loads fall back to plain soffice
+            logger.warning("No LibreOffice listener started, pool disabled")
+            _pool_failed = True
+
+    pool.shutdown()
+    return None
+
+
+def get_libreoffice_pool() -> Optional[LibreOfficePool]:
+    """Get the global pool, or None if it was never started"""
+    return _pool
+
+
+def shutdown_libreoffice_pool():
+    """Shut down the global pool if one is running, cancelling a start in progress"""
+    global _pool, _starting_pool
+    with _pool_lock:
+        pools = [pool for pool in (_pool, _starting_pool) if pool is not None]
+        _pool = None
+        _starting_pool = None
+    for pool in pools:
+        pool.shutdown()
@@ -112,17 +112,15 @@ class ImprovedLibreOfficeConverter:
             logger.info(f"LibreOffice process started with PID: {self.lo_process.pid}")
             
             # Faster detection with more frequent checks
-            start_time = time.time()
-            while time.time() - start_time < 10:  # 10 second timeout
+            start_time = time.monotonic()
+            while time.monotonic() - start_time < 10:  # 10 second timeout
                 try:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(0.2)  # Short timeout
-                    sock.connect(('localhost', self.port))
-                    sock.close()
-                    elapsed = time.time() - start_time
+                    # Short bounded probe; the socket is closed even on failure
+                    socket.create_connection(('localhost', self.port), timeout=0.05).close()
+                    elapsed = time.monotonic() - start_time
                     logger.info(f"✅ LibreOffice service ready in {elapsed:.1f}s on port {self.port}")
                     return True
-                except socket.error:
+                except OSError:
                     # Check if process died
                     if self.lo_process.poll() is not None:
                         stdout, stderr = self.lo_process.communicate()
@@ -133,7 +131,7 @@ class ImprovedLibreOfficeConverter:
                         logger.error("==========================================")
                         logger.error("LibreOffice process terminated during startup")
                         return False
-                    time.sleep(0.2)  # Check every 0.2 seconds (50 checks total)
+                    time.sleep(0.1)
             
             logger.error("LibreOffice service failed to start within 10 seconds")
             return False
@@ -156,11 +154,9 @@ class ImprovedLibreOfficeConverter:
                     return self.convert_with_uno(input_path, retry_count + 1)
             
             # Test connection before proceeding
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             try:
-                sock.connect(('localhost', self.port))
-                sock.close()
-            except socket.error:
+                socket.create_connection(('localhost', self.port), timeout=0.5).close()
+            except OSError:
                 logger.warning("LibreOffice service not responding, restarting...")
                 self._kill_existing_libreoffice()
                 self.lo_process = None
@@ -65,10 +65,10 @@ class WindowTracker:
         Returns:
             WindowInfo if found, None otherwise
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         attempt = 0
         
-        while time.time() - start_time < timeout:
+        while time.monotonic() - start_time < timeout:
             attempt += 1
             logger.debug(f"Window search attempt {attempt}")
             
@@ -85,6 +85,8 @@ class Config:
     UNO_TIMEOUT = 30
     UNO_RETRY_COUNT = 3
     UNO_RETRY_DELAY = 2
+    LIBREOFFICE_POOL_PORT = 0     # First port of the viewer listeners (0 = random assignment)
+    LIBREOFFICE_POOL_SIZE = 2     # Listeners, each on its own port and profile
     
     # Startup settings
     BACKEND_STARTUP_TIMEOUT = 30  # seconds
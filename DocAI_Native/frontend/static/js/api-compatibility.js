@@ -209,4 +209,36 @@ document.addEventListener('DOMContentLoaded', () => {
 window.addEventListener('pywebviewready', () => {
     console.log('[APICompat] PyWebView ready event received');
     window.apiCompat.initialize();
-});
\ No newline at end of file
+});
+/**
+ * Background job results pushed from Python via evaluate_js.
+ * Long-running bridge calls (embedDocument) return {pending: true, job_id}
+ * immediately; docaiBridge.wait() turns that into the final result.
+ */
+window.docaiBridge = {
+    _waiters: new Map(),
+    _results: new Map(),
+    
+    _resolve(jobId, result) {
+        const waiter = this._waiters.get(jobId);
+        if (waiter) {
+            this._waiters.delete(jobId);
+            waiter(result);
+        } else {
+            // Result arrived before anyone waited on it
+            this._results.set(jobId, result);
+        }
+    },
+    
+    wait(response) {
+        if (!response || !response.pending) return Promise.resolve(response);
+        
+        const jobId = response.job_id;
+        if (this._results.has(jobId)) {
+            const result = this._results.get(jobId);
+            this._results.delete(jobId);
+            return Promise.resolve(result);
+        }
+        return new Promise(resolve => this._waiters.set(jobId, resolve));
+    }
+};
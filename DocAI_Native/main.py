@@ -3,33 +3,30 @@ DocAI Native - Enterprise Main Application
 Enhanced startup/shutdown with dynamic ports, robust logging, and signal handling
 """
 
-import webview
 import threading
 import socket
 import signal
 import sys
 import os
 import time
+import hashlib
 import logging
-import logging.handlers
 import argparse
 from pathlib import Path
-from werkzeug.serving import make_server
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
 
 from config import CFG
 from backend_server import create_app
-from native_api_simple import SimpleNativeAPI
-from native_api_dict import api_dict, set_window
-from native_api_hybrid import hybrid_api, set_window as hybrid_set_window
-from native_api_lambda import lambda_api, set_window_ref as lambda_set_window
-from native_api_fixed import FixedAPI
+from app.logging_config import RawAppendHandler
 from uno_bridge import UNOSocketBridge
 
 
 class ApplicationContext:
     """Manages application lifecycle and resources"""
     
+    FRONTEND_HASH_FILE = CFG.CACHE_DIR / 'frontend.hash'
+    
     def __init__(self):
         self.flask_server = None
         self.uno_bridge = None
@@ -38,6 +35,8 @@ class ApplicationContext:
         self.logger = None
         self.shutdown_event = threading.Event()
         self.hot_reload_thread = None
+        self.cache_clear_futures = []
+        self.pending_frontend_hash = None
         
     def setup_logging(self):
         """Configure enterprise logging with rotation"""
@@ -45,30 +44,36 @@ class ApplicationContext:
         log_dir = CFG.LOG_FILE.parent
         log_dir.mkdir(exist_ok=True)
         
+        # Accept either a level name ("DEBUG") or a numeric level
+        if isinstance(CFG.LOG_LEVEL, str):
+            level = getattr(logging, CFG.LOG_LEVEL.upper())
+        else:
+            level = int(CFG.LOG_LEVEL)
+        
         # Root logger setup
         self.logger = logging.getLogger(__name__)
         root_logger = logging.getLogger()
-        root_logger.setLevel(getattr(logging, CFG.LOG_LEVEL))
+        root_logger.setLevel(level)
         
         # Clear existing handlers
         root_logger.handlers.clear()
         
         # Console handler with context
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(max(level, logging.INFO))
         console_formatter = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(name)-20s | %(message)s',
             datefmt='%H:%M:%S'
         )
         console_handler.setFormatter(console_formatter)
         
-        # Rotating file handler
-        file_handler = logging.handlers.RotatingFileHandler(
+        # Rotating file handler (one O_APPEND write per record)
+        file_handler = RawAppendHandler(
             CFG.LOG_FILE,
-            maxBytes=CFG.LOG_MAX_BYTES,
-            backupCount=CFG.LOG_BACKUP_COUNT
+            max_bytes=CFG.LOG_MAX_BYTES,
+            backup_count=CFG.LOG_BACKUP_COUNT
         )
-        file_handler.setLevel(getattr(logging, CFG.LOG_LEVEL))
+        file_handler.setLevel(level)
         file_formatter = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(name)-30s | %(funcName)-20s:%(lineno)-4d | %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
@@ -88,6 +93,14 @@ class ApplicationContext:
     def get_free_port(self):
         """Get a free port from the OS"""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Let the consumer re-bind the port right after we release it,
+            # even if a failed attempt left it in TIME_WAIT
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                try:
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                except OSError:
+                    pass
             s.bind(('', 0))
             s.listen(1)
             port = s.getsockname()[1]
@@ -119,6 +132,8 @@ class ApplicationContext:
     
     def start_flask_server(self, port):
         """Start Flask server with proper WSGI server"""
+        from werkzeug.serving import make_server
+        
         self.logger.info(f"Starting Flask server on port {port}")
         
         # Pass UNO bridge to Flask app if available
@@ -131,26 +146,28 @@ class ApplicationContext:
         actual_port = self.flask_server.server_port
         self.logger.info(f"Flask server bound to port {actual_port}")
         
+        # make_server() has already bound and is listening, so the server is
+        # ready as soon as its thread is running - no need to poll the port
+        ready = threading.Event()
+
+        def serve():
+            ready.set()
+            self.flask_server.serve_forever()
+
         # Start server in thread
         server_thread = threading.Thread(
-            target=self.flask_server.serve_forever,
+            target=serve,
             daemon=True,
             name="FlaskServer"
         )
         server_thread.start()
-        
+
         # Wait for server to be ready
-        start_time = time.time()
-        while time.time() - start_time < CFG.BACKEND_STARTUP_TIMEOUT:
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.connect(('127.0.0.1', actual_port))
-                    self.logger.info("Flask server is ready")
-                    return actual_port
-            except ConnectionRefusedError:
-                time.sleep(0.1)
-        
-        raise RuntimeError(f"Flask server failed to start within {CFG.BACKEND_STARTUP_TIMEOUT}s")
+        if not ready.wait(CFG.BACKEND_STARTUP_TIMEOUT):
+            raise RuntimeError(f"Flask server failed to start within {CFG.BACKEND_STARTUP_TIMEOUT}s")
+
+        self.logger.info("Flask server is ready")
+        return actual_port
     
     def start_uno_bridge(self):
         """Start UNO bridge with dynamic port and retry logic"""
@@ -173,6 +190,19 @@ class ApplicationContext:
         self.logger.error("Failed to start UNO bridge after all retries")
         return False
     
+    def start_libreoffice_pool(self):
+        """Start the persistent LibreOffice listener in the background"""
+        # Only the Linux document embedder opens documents through the pool
+        if not sys.platform.startswith('linux'):
+            return
+        
+        from app.services.libreoffice_pool import start_libreoffice_pool
+        threading.Thread(
+            target=start_libreoffice_pool,
+            daemon=True,
+            name="LibreOfficePool"
+        ).start()
+    
     def setup_hot_reload(self):
         """Setup hot reload for development"""
         if not CFG.HOT_RELOAD:
@@ -183,17 +213,54 @@ class ApplicationContext:
             from watchdog.events import FileSystemEventHandler
             
             class ReloadHandler(FileSystemEventHandler):
+                # Editors emit several events per save; coalesce them
+                DEBOUNCE_SECONDS = 0.1
+                WATCHED_EXTENSIONS = frozenset({'.html', '.css', '.js'})
+                TEMP_SUFFIXES = ('~', '.swp', '.tmp')
+
                 def __init__(self, window):
                     self.window = window
                     self.logger = logging.getLogger(self.__class__.__name__)
-                    
+                    self._lock = threading.Lock()
+                    self._timer = None
+                    self._changed_paths = set()
+                    self._last_event_time = 0.0
+
                 def on_modified(self, event):
                     if event.is_directory:
                         return
-                    if event.src_path.endswith(('.html', '.css', '.js')):
-                        self.logger.info(f"Frontend file changed: {event.src_path}")
-                        if self.window:
-                            self.window.reload()
+                    path = event.src_path
+                    if path.endswith(self.TEMP_SUFFIXES):
+                        return
+                    if os.path.splitext(path)[1] not in self.WATCHED_EXTENSIONS:
+                        return
+                    with self._lock:
+                        self._changed_paths.add(path)
+                        self._last_event_time = time.monotonic()
+                        if self._timer is None:
+                            self._schedule(self.DEBOUNCE_SECONDS)
+
+                def _schedule(self, delay):
+                    """Arm the flush timer (caller holds the lock)"""
+                    self._timer = threading.Timer(delay, self._flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+                def _flush(self):
+                    """Reload once the burst of events has gone quiet"""
+                    with self._lock:
+                        quiet_for = time.monotonic() - self._last_event_time
+                        if quiet_for < self.DEBOUNCE_SECONDS:
+                            # More events arrived - wait for the burst to end
+                            self._schedule(self.DEBOUNCE_SECONDS - quiet_for)
+                            return
+                        changed = self._changed_paths
+                        self._changed_paths = set()
+                        self._timer = None
+
+                    self.logger.info(f"Frontend files changed: {', '.join(sorted(changed))}")
+                    if self.window:
+                        self.window.reload()
             
             observer = Observer()
             observer.schedule(
@@ -211,6 +278,8 @@ class ApplicationContext:
     
     def create_window(self, port):
         """Create and configure the main window"""
+        import webview
+        
         self.logger.info("Creating application window...")
         
         # Use NativeAPIBridge for unified API access
@@ -221,31 +290,49 @@ class ApplicationContext:
         self.logger.info(f"Native API class: {self.native_api.__class__.__name__}")
         
         # Verify the methods are callable
-        for method_name in ['pickFile', 'checkLibreOffice', 'embedDocument', 'getFeatures']:
-            if hasattr(self.native_api, method_name):
-                method = getattr(self.native_api, method_name)
-                self.logger.info(f"✓ {method_name}: {type(method)}")
-            else:
-                self.logger.error(f"✗ {method_name}: NOT FOUND")
+        methods = {
+            name: getattr(self.native_api, name, None)
+            for name in ('pickFile', 'checkLibreOffice', 'embedDocument', 'getFeatures')
+        }
+        missing = [name for name, method in methods.items() if method is None]
+        if missing:
+            self.logger.error(f"✗ API methods NOT FOUND: {', '.join(missing)}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("API methods: %s", {name: type(method).__name__ for name, method in methods.items()})
         
         # Clear PyWebView cache before creating window
-        import shutil
         import tempfile
         cache_paths = [
             Path.home() / '.pywebview',
             Path(tempfile.gettempdir()) / 'pywebview',
-            Path.home() / 'AppData' / 'Local' / 'pywebview' / 'EBWebView',  # Windows
-            Path.home() / '.cache' / 'pywebview',  # Linux
-            Path.home() / 'Library' / 'Caches' / 'pywebview',  # macOS
         ]
+        if sys.platform == 'win32':
+            cache_paths.append(Path.home() / 'AppData' / 'Local' / 'pywebview' / 'EBWebView')
+        elif sys.platform == 'darwin':
+            cache_paths.append(Path.home() / 'Library' / 'Caches' / 'pywebview')
+        else:
+            cache_paths.append(Path.home() / '.cache' / 'pywebview')
         
-        for cache_path in cache_paths:
-            if cache_path.exists():
-                try:
-                    shutil.rmtree(cache_path)
-                    self.logger.info(f"Cleared cache at: {cache_path}")
-                except Exception as e:
-                    self.logger.warning(f"Could not clear cache at {cache_path}: {e}")
+        # Only invalidate the cache when the frontend actually changed
+        fingerprint = self._frontend_fingerprint()
+        try:
+            previous = self.FRONTEND_HASH_FILE.read_text().strip()
+        except OSError:
+            previous = None
+        
+        if fingerprint == previous:
+            self.logger.info("Frontend unchanged - keeping PyWebView cache")
+        else:
+            # Clear caches in the background; they only need to be gone before
+            # webview.start(), so window construction can overlap the I/O
+            existing = [cache_path for cache_path in cache_paths if cache_path.exists()]
+            if existing:
+                executor = ThreadPoolExecutor(max_workers=len(existing), thread_name_prefix="CacheClear")
+                self.cache_clear_futures = [
+                    executor.submit(self._clear_cache_dir, cache_path) for cache_path in existing
+                ]
+                executor.shutdown(wait=False)
+            self.pending_frontend_hash = fingerprint
         
         # Create window
         self.window = webview.create_window(
@@ -270,6 +357,50 @@ class ApplicationContext:
         
         return self.window
     
+    def _frontend_fingerprint(self):
+        """Digest of frontend file names, sizes and mtimes"""
+        digest = hashlib.blake2s()
+        pending = [str(CFG.FRONTEND_DIR)]
+        while pending:
+            try:
+                with os.scandir(pending.pop()) as it:
+                    entries = sorted(it, key=lambda entry: entry.path)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                else:
+                    st = entry.stat()
+                    digest.update(f"{entry.path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+    
+    def finish_cache_clear(self):
+        """Wait for cache removal and record the frontend fingerprint if it all went"""
+        wait(self.cache_clear_futures)
+        cleared = all(future.result() for future in self.cache_clear_futures)
+        if self.pending_frontend_hash:
+            if not cleared:
+                # Leave the old fingerprint so the next launch clears again
+                self.logger.warning("PyWebView cache not fully cleared - frontend hash not saved")
+            else:
+                try:
+                    self.FRONTEND_HASH_FILE.write_text(self.pending_frontend_hash)
+                except OSError as e:
+                    self.logger.warning(f"Could not save frontend hash: {e}")
+            self.pending_frontend_hash = None
+    
+    def _clear_cache_dir(self, cache_path):
+        """Remove a single PyWebView cache directory; True on success"""
+        import shutil
+        try:
+            shutil.rmtree(cache_path)
+            self.logger.info(f"Cleared cache at: {cache_path}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Could not clear cache at {cache_path}: {e}")
+            return False
+    
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown"""
         self._shutting_down = False
@@ -319,6 +450,15 @@ class ApplicationContext:
             except Exception as e:
                 self.logger.error(f"Error shutting down UNO bridge: {e}")
         
+        # Close listener documents, then shut down the persistent LibreOffice listener
+        try:
+            from app.services.document_embedder import close_document_embedder
+            close_document_embedder()
+            from app.services.libreoffice_pool import shutdown_libreoffice_pool
+            shutdown_libreoffice_pool()
+        except Exception as e:
+            self.logger.error(f"Error shutting down LibreOffice pool: {e}")
+        
         # Shutdown Flask server
         if self.flask_server:
             try:
@@ -419,13 +559,17 @@ def main():
             app_ctx.logger.error("Dependency validation failed")
             sys.exit(1)
         
-        # 3. Get dynamic port
-        port = CFG.FLASK_PORT or app_ctx.get_free_port()
+        # 3. Get dynamic port (0 lets make_server bind an ephemeral port
+        #    itself, avoiding a probe-then-rebind race)
+        port = CFG.FLASK_PORT or 0
         
         # 4. Start UNO bridge with retry logic (before Flask to enable window manager)
         if not app_ctx.start_uno_bridge():
             app_ctx.logger.warning("UNO bridge failed - continuing without LibreOffice integration")
         
+        # 4b. Warm the persistent LibreOffice listener used for viewing (Linux)
+        app_ctx.start_libreoffice_pool()
+        
         # 5. Start Flask server with WSGI (after UNO bridge so it can initialize window manager)
         actual_port = app_ctx.start_flask_server(port)
         
@@ -439,7 +583,9 @@ def main():
         window.events.loaded += app_ctx.on_window_ready
         
         # 9. Start GUI (blocking call)
+        import webview
         app_ctx.logger.info("Starting GUI main loop...")
+        app_ctx.finish_cache_clear()
         webview.start(debug=CFG.DEBUG)
         
     except KeyboardInterrupt:
@@ -4,9 +4,13 @@ Exposes native functionality to JavaScript frontend
 """
 
 import os
+import stat
 import logging
 import time
-from pathlib import Path
+import threading
+import itertools
+import collections
+from operator import attrgetter, itemgetter
 import webview
 import platform
 
@@ -15,79 +19,124 @@ from app.api.overlay_api import OverlayAPI
 
 logger = logging.getLogger(__name__)
 
+# File dialog constants, shared across picker calls
+_OPEN_DIALOG = webview.OPEN_DIALOG
+_PICK_FILE_TYPES = (
+    'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
+    'Word documents (*.docx;*.doc)',
+    'PDF files (*.pdf)',
+    'Text files (*.txt)',
+    'All files (*.*)'
+)
+_PICK_MULTIPLE_FILE_TYPES = (
+    'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
+    'All files (*.*)'
+)
+
+
+def _default_window_bounds(window):
+    """Read window bounds, falling back to defaults for missing attributes"""
+    return (
+        getattr(window, 'x', 100),
+        getattr(window, 'y', 100),
+        getattr(window, 'width', 1200),
+        getattr(window, 'height', 800)
+    )
+
+
 class NativeAPI:
     """API exposed to JavaScript frontend"""
     
+    _LOG_LEVELS = {
+        'debug': logging.DEBUG,
+        'info': logging.INFO,
+        'warning': logging.WARNING,
+        'warn': logging.WARNING,
+        'error': logging.ERROR,
+        'critical': logging.CRITICAL
+    }
+    _LOG_FLUSH_SIZE = 64
+    _LOG_FLUSH_INTERVAL = 0.05  # seconds
+    _ALLOWED_CONFIG_KEYS = frozenset({'WINDOW_WIDTH', 'WINDOW_HEIGHT', 'DEBUG'})
+    
     def __init__(self, uno_bridge, startup_file=None):
         # Store uno_bridge as private to avoid pywebview introspection issues
         self._uno_bridge = uno_bridge
         self.window = None
+        self._window_bounds_reader = _default_window_bounds
         self.startup_file = startup_file
-        self._platform_info = None  # Cache platform info
+        # Process-lifetime info is built once; config-derived info is rebuilt
+        # only when set_config changes it
+        self._platform_info = {
+            "system": platform.system(),
+            "version": platform.version(),
+            "machine": platform.machine(),
+            "python_version": platform.python_version(),
+            "app_version": CFG.VERSION
+        }
+        self._app_info = None
+        self._config_snapshot = None
+        
+        # Frontend log records are buffered and flushed in batches
+        self._log_buffer = collections.deque(maxlen=1024)
+        self._log_lock = threading.Lock()
+        self._log_flush_timer = None
         
         # Initialize overlay API
         self.overlay = OverlayAPI()
         
-        logger.info(f"Native API initialized with startup_file: {startup_file}")
+        logger.info("Native API initialized with startup_file: %s", startup_file)
     
     def set_window(self, window):
         """Set the webview window reference"""
         self.window = window
+        # Resolve how to read bounds once instead of probing on every call
+        if all(hasattr(window, attr) for attr in ('x', 'y', 'width', 'height')):
+            self._window_bounds_reader = attrgetter('x', 'y', 'width', 'height')
+        else:
+            self._window_bounds_reader = _default_window_bounds
         logger.info("Window reference set in Native API")
     
     # File Operations
     def pick_file(self):
         """Native file picker dialog"""
         try:
-            file_types = (
-                'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-                'Word documents (*.docx;*.doc)',
-                'PDF files (*.pdf)',
-                'Text files (*.txt)',
-                'All files (*.*)'
-            )
-            
             result = self.window.create_file_dialog(
-                webview.OPEN_DIALOG,
+                _OPEN_DIALOG,
                 allow_multiple=False,
-                file_types=file_types
+                file_types=_PICK_FILE_TYPES
             )
             
             if result and len(result) > 0:
-                file_path = str(Path(result[0]).resolve())
-                logger.info(f"File selected: {file_path}")
+                file_path = os.path.abspath(result[0])
+                logger.info("File selected: %s", file_path)
                 return file_path
             
             logger.info("No file selected")
             return None
             
         except Exception as e:
-            logger.error(f"Error in pick_file: {e}")
+            logger.error("Error in pick_file: %s", e)
             return None
     
     def pick_multiple_files(self):
         """Pick multiple files"""
         try:
-            file_types = (
-                'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-                'All files (*.*)'
-            )
-            
             result = self.window.create_file_dialog(
-                webview.OPEN_DIALOG,
+                _OPEN_DIALOG,
                 allow_multiple=True,
-                file_types=file_types
+                file_types=_PICK_MULTIPLE_FILE_TYPES
             )
             
             if result:
-                file_paths = [str(Path(f).resolve()) for f in result]
-                logger.info(f"Multiple files selected: {len(file_paths)} files")
+                file_paths = list(map(os.path.abspath, result))
+                logger.info("Multiple files selected: %d files", len(file_paths))
                 return file_paths
             
             return []
             
         except Exception as e:
-            logger.error(f"Error in pick_multiple_files: {e}")
+            logger.error("Error in pick_multiple_files: %s", e)
             return []
     
     def open_file(self, file_path):
@@ -97,19 +146,18 @@ class NativeAPI:
                 logger.error("No file path provided to open_file")
                 return False
                 
-            path = Path(file_path)
-            if not path.exists():
-                logger.error(f"File does not exist: {file_path}")
+            if not os.path.exists(file_path):
+                logger.error("File does not exist: %s", file_path)
                 return False
                 
-            logger.info(f"Opening file programmatically: {file_path}")
+            logger.info("Opening file programmatically: %s", file_path)
             
             # TODO: Integrate with frontend to display the file
             # For now, just log the action
             return True
             
         except Exception as e:
-            logger.error(f"Error in open_file: {e}")
+            logger.error("Error in open_file: %s", e)
             return False
     
     def pick_folder(self):
@@ -117,15 +165,15 @@ class NativeAPI:
         try:
             result = self.window.create_file_dialog(webview.FOLDER_DIALOG)
             if result and len(result) > 0:
-                folder_path = str(Path(result[0]).resolve())
-                logger.info(f"Folder selected: {folder_path}")
+                folder_path = os.path.abspath(result[0])
+                logger.info("Folder selected: %s", folder_path)
                 return folder_path
             
             logger.info("No folder selected")
             return None
             
         except Exception as e:
-            logger.error(f"Error in pick_folder: {e}")
+            logger.error("Error in pick_folder: %s", e)
             return None
     
     def save_file(self, suggested_name="document.docx"):
@@ -137,45 +185,46 @@ class NativeAPI:
             )
             
             if result:
-                save_path = str(Path(result).resolve())
-                logger.info(f"Save location selected: {save_path}")
+                save_path = os.path.abspath(result)
+                logger.info("Save location selected: %s", save_path)
                 return save_path
             
             logger.info("Save cancelled")
             return None
             
         except Exception as e:
-            logger.error(f"Error in save_file: {e}")
+            logger.error("Error in save_file: %s", e)
             return None
     
     # File System Operations
     def get_file_info(self, file_path):
         """Get file information"""
         try:
-            path = Path(file_path)
-            if not path.exists():
+            try:
+                st = os.stat(file_path)
+            except FileNotFoundError:
                 return {"error": "File not found"}
             
-            stat = path.stat()
+            name = os.path.basename(os.path.normpath(file_path))
             return {
-                "name": path.name,
-                "size": stat.st_size,
-                "modified": stat.st_mtime,
-                "extension": path.suffix,
-                "is_file": path.is_file(),
-                "is_dir": path.is_dir()
+                "name": name,
+                "size": st.st_size,
+                "modified": st.st_mtime,
+                "extension": os.path.splitext(name)[1],
+                "is_file": stat.S_ISREG(st.st_mode),
+                "is_dir": stat.S_ISDIR(st.st_mode)
             }
             
         except Exception as e:
-            logger.error(f"Error getting file info: {e}")
+            logger.error("Error getting file info: %s", e)
             return {"error": str(e)}
     
     def check_file_exists(self, file_path):
         """Check if file exists"""
         try:
-            return Path(file_path).exists()
+            return os.path.exists(file_path)
         except Exception as e:
-            logger.error(f"Error checking file existence: {e}")
+            logger.error("Error checking file existence: %s", e)
             return False
     
     # LibreOffice Integration
@@ -186,12 +235,12 @@ class NativeAPI:
                 logger.warning("UNO bridge not available")
                 return {"error": "LibreOffice integration not available"}
             
-            logger.info(f"Embedding LibreOffice for file: {file_path}")
+            logger.info("Embedding LibreOffice for file: %s", file_path)
             result = self._uno_bridge.embed_document(file_path, container_id)
-            logger.info(f"Embed result: {result}")
+            logger.info("Embed result: %s", result)
             return result
         except Exception as e:
-            logger.error(f"Error embedding LibreOffice: {e}")
+            logger.error("Error embedding LibreOffice: %s", e)
             return {"error": str(e)}
     
     def start_libreoffice_server(self):
@@ -202,10 +251,10 @@ class NativeAPI:
                 return {"error": "LibreOffice integration not available"}
             
             result = self._uno_bridge.start_libreoffice_server()
-            logger.info(f"LibreOffice server start result: {result}")
+            logger.info("LibreOffice server start result: %s", result)
             return {"success": result}
         except Exception as e:
-            logger.error(f"Error starting LibreOffice server: {e}")
+            logger.error("Error starting LibreOffice server: %s", e)
             return {"error": str(e)}
     
     # System Integration
@@ -216,43 +265,39 @@ class NativeAPI:
                 self.window.create_confirmation_dialog(title, message)
             elif type == "error":
                 # Use system notification for errors
-                logger.error(f"{title}: {message}")
+                logger.error("%s: %s", title, message)
             elif type == "warning":
-                logger.warning(f"{title}: {message}")
+                logger.warning("%s: %s", title, message)
             
             return {"success": True}
             
         except Exception as e:
-            logger.error(f"Error showing message: {e}")
+            logger.error("Error showing message: %s", e)
             return {"error": str(e)}
     
     def show_notification(self, title, message):
         """Show system notification"""
         try:
             # This would require additional dependencies for cross-platform notifications
-            logger.info(f"Notification: {title} - {message}")
+            logger.info("Notification: %s - %s", title, message)
             return {"success": True}
         except Exception as e:
-            logger.error(f"Error showing notification: {e}")
+            logger.error("Error showing notification: %s", e)
             return {"error": str(e)}
     
     # Platform Information
     def get_platform_info(self):
         """Get platform information"""
-        try:
-            return {
-                "system": platform.system(),
-                "version": platform.version(),
-                "machine": platform.machine(),
-                "python_version": platform.python_version(),
-                "app_version": CFG.VERSION
-            }
-        except Exception as e:
-            logger.error(f"Error getting platform info: {e}")
-            return {"error": str(e)}
+        return self._platform_info
     
     def get_app_info(self):
         """Get application information"""
+        if self._app_info is None:
+            self._app_info = self._build_app_info()
+        return self._app_info
+    
+    def _build_app_info(self):
+        """Build application information from current config"""
         return {
             "name": CFG.APP_NAME,
             "version": CFG.VERSION,
@@ -273,15 +318,11 @@ class NativeAPI:
         try:
             if self.window:
                 # Get window bounds
-                return {
-                    "x": self.window.x if hasattr(self.window, 'x') else 100,
-                    "y": self.window.y if hasattr(self.window, 'y') else 100,
-                    "width": self.window.width if hasattr(self.window, 'width') else 1200,
-                    "height": self.window.height if hasattr(self.window, 'height') else 800
-                }
+                x, y, width, height = self._window_bounds_reader(self.window)
+                return {"x": x, "y": y, "width": width, "height": height}
             return {"x": 100, "y": 100, "width": 1200, "height": 800}
         except Exception as e:
-            logger.error(f"Error getting window info: {e}")
+            logger.error("Error getting window info: %s", e)
             return {"x": 100, "y": 100, "width": 1200, "height": 800}
     
     # Configuration
@@ -292,46 +333,79 @@ class NativeAPI:
                 return getattr(CFG, key, None)
             else:
                 # Return safe config values (no secrets)
-                return {
-                    "app_name": CFG.APP_NAME,
-                    "version": CFG.VERSION,
-                    "debug": CFG.DEBUG,
-                    "window_width": CFG.WINDOW_WIDTH,
-                    "window_height": CFG.WINDOW_HEIGHT
-                }
+                if self._config_snapshot is None:
+                    self._config_snapshot = {
+                        "app_name": CFG.APP_NAME,
+                        "version": CFG.VERSION,
+                        "debug": CFG.DEBUG,
+                        "window_width": CFG.WINDOW_WIDTH,
+                        "window_height": CFG.WINDOW_HEIGHT
+                    }
+                return self._config_snapshot
         except Exception as e:
-            logger.error(f"Error getting config: {e}")
+            logger.error("Error getting config: %s", e)
             return None
     
     def set_config(self, key, value):
         """Set configuration value"""
         try:
             # Only allow certain config changes
-            allowed_keys = {
-                'WINDOW_WIDTH', 'WINDOW_HEIGHT', 'DEBUG'
-            }
-            
-            if key in allowed_keys:
+            if key in self._ALLOWED_CONFIG_KEYS:
                 setattr(CFG, key, value)
-                logger.info(f"Config updated: {key} = {value}")
+                # Invalidate cached info built from config
+                self._app_info = None
+                self._config_snapshot = None
+                logger.info("Config updated: %s = %s", key, value)
                 return {"success": True}
             else:
                 return {"error": f"Config key '{key}' is not modifiable"}
                 
         except Exception as e:
-            logger.error(f"Error setting config: {e}")
+            logger.error("Error setting config: %s", e)
             return {"error": str(e)}
     
     # Utility Methods
     def log_message(self, level, message):
         """Log message from frontend"""
+        return self.log_messages([(level, message)])
+    
+    def log_messages(self, records):
+        """Log a batch of (level, message) records from frontend"""
         try:
-            getattr(logger, level.lower())(f"Frontend: {message}")
+            entries = []
+            for level, message in records:
+                log_level = self._LOG_LEVELS.get(level.lower())
+                if log_level is None:
+                    return {"error": f"Unknown log level: {level}"}
+                entries.append((log_level, message))
+            
+            with self._log_lock:
+                self._log_buffer.extend(entries)
+                flush_now = len(self._log_buffer) >= self._LOG_FLUSH_SIZE
+                if not flush_now and self._log_flush_timer is None:
+                    self._log_flush_timer = threading.Timer(self._LOG_FLUSH_INTERVAL, self._flush_logs)
+                    self._log_flush_timer.daemon = True
+                    self._log_flush_timer.start()
+            
+            if flush_now:
+                self._flush_logs()
             return {"success": True}
         except Exception as e:
-            logger.error(f"Error logging message: {e}")
+            logger.error("Error logging message: %s", e)
             return {"error": str(e)}
     
+    def _flush_logs(self):
+        """Emit buffered frontend records, one log call per run of equal level"""
+        with self._log_lock:
+            if self._log_flush_timer is not None:
+                self._log_flush_timer.cancel()
+                self._log_flush_timer = None
+            records = list(self._log_buffer)
+            self._log_buffer.clear()
+        
+        for level, group in itertools.groupby(records, key=itemgetter(0)):
+            logger.log(level, "Frontend: %s", "\n".join(message for _, message in group))
+    
     def ping(self):
         """Simple ping to test API connectivity"""
         return {"pong": True, "timestamp": time.time()}
@@ -341,6 +415,7 @@ class NativeAPI:
         """Graceful shutdown"""
         try:
             logger.info("Shutdown requested from frontend")
+            self._flush_logs()
             
             # Stop overlay if running
             if self.overlay:
@@ -353,5 +428,5 @@ class NativeAPI:
                 self.window.destroy()
             return {"success": True}
         except Exception as e:
-            logger.error(f"Error during shutdown: {e}")
+            logger.error("Error during shutdown: %s", e)
             return {"error": str(e)}
\ No newline at end of file
@@ -2,18 +2,104 @@
 Native API Bridge - Unified API for PyWebView
 Combines file operations and overlay functionality
 """
+import json
+import itertools
 import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+
+def _warm_dialog_windows():
+    """Create and release an IFileOpenDialog so the shell DLLs are loaded"""
+    import ctypes
+    
+    class GUID(ctypes.Structure):
+        _fields_ = [
+            ("Data1", ctypes.c_ulong),
+            ("Data2", ctypes.c_ushort),
+            ("Data3", ctypes.c_ushort),
+            ("Data4", ctypes.c_ubyte * 8)
+        ]
+    
+    ole32 = ctypes.windll.ole32
+    clsid, iid = GUID(), GUID()
+    ole32.CLSIDFromString("{DC1C5A9C-E88A-4DDE-A5A1-60F82A20AEF7}", ctypes.byref(clsid))  # CLSID_FileOpenDialog
+    ole32.CLSIDFromString("{D57C7288-D4AD-4768-BE02-9D969532D960}", ctypes.byref(iid))  # IID_IFileOpenDialog
+    
+    ole32.CoInitializeEx(None, 2)  # COINIT_APARTMENTTHREADED
+    try:
+        dialog = ctypes.c_void_p()
+        hr = ole32.CoCreateInstance(ctypes.byref(clsid), None, 1, ctypes.byref(iid), ctypes.byref(dialog))
+        if hr == 0 and dialog:
+            # IUnknown::Release is the third vtable entry
+            vtable = ctypes.cast(dialog, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p)))[0]
+            ctypes.WINFUNCTYPE(ctypes.c_ulong, ctypes.c_void_p)(vtable[2])(dialog)
+    finally:
+        ole32.CoUninitialize()
+
+
+def _gtk_backend_active():
+    """True when pywebview is running its GTK backend"""
+    import webview
+    # Set by webview.start() to the platform module it picked
+    guilib = getattr(webview, 'guilib', None)
+    return guilib is not None and guilib.__name__.endswith('.gtk')
+
+
+def _warm_dialog_gtk():
+    """Build and discard a GTK file chooser on the GTK main loop"""
+    if not _gtk_backend_active():
+        # Qt and other backends have their own dialogs; don't start GTK in them
+        return
+    
+    # pywebview has already initialised GTK on the main thread, so this import
+    # only looks up the loaded module
+    from gi.repository import Gtk, GLib
+    
+    def build_and_destroy():
+        # Runs on the main loop, outside _warm_dialog's try
+        try:
+            Gtk.FileChooserDialog(action=Gtk.FileChooserAction.OPEN).destroy()
+        except Exception as e:
+            logger.debug("File dialog warm-up failed: %s", e)
+        return False  # run once
+    
+    # GTK widgets may only be created on the main thread
+    GLib.idle_add(build_and_destroy)
+
+
+def _warm_dialog():
+    """Pre-initialize the native file dialog so the first pickFile opens quickly"""
+    try:
+        if sys.platform == 'win32':
+            _warm_dialog_windows()
+        elif sys.platform.startswith('linux'):
+            _warm_dialog_gtk()
+        logger.debug("File dialog warmed")
+    except Exception as e:
+        logger.debug("File dialog warm-up skipped: %s", e)
+
+
 class NativeAPIBridge:
     """
     Bridge pattern to expose all native functionality through a clean API.
     This solves the PyWebView compatibility issues while maintaining modularity.
     """
     
+    # Overlay geometry arrives on every drag/resize tick; apply at most once per frame
+    GEOMETRY_FLUSH_INTERVAL = 0.016  # seconds
+    
+    __slots__ = (
+        '_file_api', '_overlay_api', '_window', '_geometry_lock', '_pending_bounds',
+        '_pending_position', '_geometry_timer', '_flush_lock', '_executor', '_job_ids',
+        '_features', '_features_response'
+    )
+    
     def __init__(self):
         # Import here to avoid circular imports
         from native_api_fixed import FixedAPI
@@ -23,12 +109,24 @@ class NativeAPIBridge:
         self._overlay_api = None  # Lazy initialization
         self._window = None
         
+        # Latest overlay geometry waiting to be applied
+        self._geometry_lock = threading.Lock()
+        self._pending_bounds = None
+        self._pending_position = None
+        self._geometry_timer = None
+        self._flush_lock = threading.Lock()
+        
+        # Slow calls run here and report back through window.docaiBridge
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="BridgeJob")
+        self._job_ids = itertools.count(1)
+        
         # Feature flags for progressive rollout
         self._features = {
             'overlay_enabled': True,
             'native_viewer': True,
             'debug_mode': True
         }
+        self._features_response = None  # Built on first getFeatures call
         
         logger.info("NativeAPIBridge initialized")
         
@@ -38,6 +136,14 @@ class NativeAPIBridge:
         self._file_api.set_window(window)
         logger.info("Window reference set in bridge")
         
+        # First dialog open pays for toolkit/COM setup; do it off the UI path
+        if sys.platform.startswith('linux'):
+            # The GUI backend is only known, and GTK only initialised, once
+            # webview.start() has shown the window
+            window.events.shown += _warm_dialog
+        else:
+            threading.Thread(target=_warm_dialog, daemon=True, name="DialogWarmup").start()
+        
     # File operations (delegate to FixedAPI)
     def pickFile(self):
         """Native file picker - delegated to FixedAPI"""
@@ -52,12 +158,44 @@ class NativeAPIBridge:
         return self._file_api.checkLibreOffice()
         
     def embedDocument(self, document_path):
-        """Legacy embed document method"""
-        return self._file_api.embedDocument(document_path)
+        """
+        Legacy embed document method.
+        
+        Embedding can take seconds, so it runs in the background; the result is
+        delivered to window.docaiBridge._resolve(job_id, result).
+        """
+        job_id = next(self._job_ids)
+        future = self._executor.submit(self._file_api.embedDocument, document_path)
+        future.add_done_callback(lambda f: self._push_job_result(job_id, f))
+        return {"success": True, "pending": True, "job_id": job_id}
+    
+    def _push_job_result(self, job_id, future):
+        """Send a finished background job's result to the frontend"""
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error("Bridge job %d failed: %s", job_id, e)
+            result = {"success": False, "error": str(e)}
+        
+        if not self._window:
+            logger.warning("Bridge job %d finished without a window to report to", job_id)
+            return
+        
+        try:
+            self._window.evaluate_js(
+                f"window.docaiBridge && window.docaiBridge._resolve({job_id}, {json.dumps(result, default=str)})"
+            )
+        except Exception as e:
+            logger.error("Failed to deliver bridge job %d result: %s", job_id, e)
         
     # Overlay operations (lazy loaded)
     def _ensure_overlay(self):
-        """Lazy initialize overlay API"""
+        """
+        Lazy initialize overlay API.
+        
+        Callers use `self._overlay_api or self._ensure_overlay()`, so once the
+        overlay exists the hot path is a single attribute read.
+        """
         if not self._overlay_api and self._features['overlay_enabled']:
             try:
                 from app.api.overlay_api import OverlayAPI
@@ -66,46 +204,97 @@ class NativeAPIBridge:
             except Exception as e:
                 logger.error(f"Failed to initialize overlay: {e}")
                 self._features['overlay_enabled'] = False
+                self._features_response = None
+        return self._overlay_api
                 
     def initializeOverlay(self, documents_dir: str) -> Dict[str, Any]:
         """Initialize overlay system"""
-        self._ensure_overlay()
-        if self._overlay_api:
-            return self._overlay_api.initialize(documents_dir)
+        overlay = self._overlay_api or self._ensure_overlay()
+        if overlay:
+            return overlay.initialize(documents_dir)
         return {"success": False, "error": "Overlay not available"}
         
     def loadDocumentOverlay(self, filename: str, bounds: Dict[str, Any]) -> Dict[str, Any]:
         """Load document with overlay positioning"""
-        self._ensure_overlay()
-        if self._overlay_api:
-            return self._overlay_api.load_document_overlay(filename, bounds)
+        overlay = self._overlay_api or self._ensure_overlay()
+        if overlay:
+            # Queued bounds predate the ones passed here
+            self._discard_pending_geometry()
+            return overlay.load_document_overlay(filename, bounds)
         return {"success": False, "error": "Overlay not available"}
         
     def updateContainerBounds(self, bounds: Dict[str, Any]) -> Dict[str, Any]:
         """Update overlay container bounds"""
-        self._ensure_overlay()
-        if self._overlay_api:
-            return self._overlay_api.update_container_bounds(bounds)
+        if self._overlay_api or self._ensure_overlay():
+            return self._queue_geometry(bounds=bounds)
         return {"success": False, "error": "Overlay not available"}
         
     def stopOverlay(self) -> Dict[str, Any]:
         """Stop overlay and close LibreOffice"""
+        self._discard_pending_geometry()
         if self._overlay_api:
             return self._overlay_api.stop_overlay()
         return {"success": True}  # Nothing to stop
         
     def getOverlayStatus(self) -> Dict[str, Any]:
         """Get overlay system status"""
-        self._ensure_overlay()
-        if self._overlay_api:
-            return self._overlay_api.get_overlay_status()
+        overlay = self._overlay_api or self._ensure_overlay()
+        if overlay:
+            return overlay.get_overlay_status()
         return {"success": False, "available": False}
         
     def updateWindowPosition(self, x: int, y: int) -> Dict[str, Any]:
         """Update window position for overlay tracking"""
         if self._overlay_api:
-            return self._overlay_api.update_window_position(x, y)
+            return self._queue_geometry(position=(x, y))
         return {"success": False, "error": "Overlay not available"}
+    
+    def _queue_geometry(self, bounds=None, position=None) -> Dict[str, Any]:
+        """Record the latest geometry and schedule a single flush"""
+        if not self._overlay_api:
+            return {"success": False, "error": "Overlay not available"}
+        
+        with self._geometry_lock:
+            if bounds is not None:
+                self._pending_bounds = bounds
+            if position is not None:
+                self._pending_position = position
+            if self._geometry_timer is None:
+                self._geometry_timer = threading.Timer(self.GEOMETRY_FLUSH_INTERVAL, self._flush_geometry)
+                self._geometry_timer.daemon = True
+                self._geometry_timer.start()
+        return {"success": True, "queued": True}
+    
+    def _flush_geometry(self):
+        """Apply the freshest queued position and bounds to the overlay"""
+        # A new timer can fire while this flush is still talking to the
+        # overlay; serialise flushes so updates are applied in order
+        with self._flush_lock:
+            with self._geometry_lock:
+                bounds, position = self._pending_bounds, self._pending_position
+                self._pending_bounds = None
+                self._pending_position = None
+                self._geometry_timer = None
+            
+            if not self._overlay_api:
+                return
+            # Runs on the Timer thread, where an exception would go unreported
+            try:
+                if position is not None:
+                    self._overlay_api.update_window_position(*position)
+                if bounds is not None:
+                    self._overlay_api.update_container_bounds(bounds)
+            except Exception as e:
+                logger.error(f"Failed to apply overlay geometry: {e}")
+    
+    def _discard_pending_geometry(self):
+        """Drop queued geometry updates"""
+        with self._geometry_lock:
+            if self._geometry_timer is not None:
+                self._geometry_timer.cancel()
+                self._geometry_timer = None
+            self._pending_bounds = None
+            self._pending_position = None
         
     def configureSyncEngine(self, settings: Dict[str, Any]) -> Dict[str, Any]:
         """Configure overlay sync engine"""
@@ -121,21 +310,24 @@ class NativeAPIBridge:
         
     # Feature detection for frontend
     def getFeatures(self) -> Dict[str, Any]:
-        """Get available features for frontend"""
-        return {
-            "success": True,
-            "features": {
-                "file_picker": True,
-                "overlay_viewer": self._features['overlay_enabled'],
-                "native_viewer": self._features['native_viewer'],
-                "debug_mode": self._features['debug_mode']
+        """Get available features for frontend (cached until a flag changes)"""
+        if self._features_response is None:
+            self._features_response = {
+                "success": True,
+                "features": {
+                    "file_picker": True,
+                    "overlay_viewer": self._features['overlay_enabled'],
+                    "native_viewer": self._features['native_viewer'],
+                    "debug_mode": self._features['debug_mode']
+                }
             }
-        }
+        return self._features_response
         
     def setFeature(self, feature: str, enabled: bool) -> Dict[str, Any]:
         """Enable/disable features at runtime"""
         if feature in self._features:
             self._features[feature] = enabled
+            self._features_response = None
             logger.info(f"Feature '{feature}' set to {enabled}")
             return {"success": True}
         return {"success": False, "error": f"Unknown feature: {feature}"}
\ No newline at end of file
@@ -6,8 +6,8 @@ PyWebView sometimes has issues with class-based APIs, so this uses a simple dict
 import os
 import logging
 import time
-from pathlib import Path
-import webview
+
+from native_api_simple import show_file_dialog, DOCUMENT_FILE_TYPES
 
 logger = logging.getLogger(__name__)
 
@@ -22,47 +22,23 @@ def set_window(window):
 
 def pickFile():
     """Native file picker dialog"""
-    logger.info("pickFile called from dict API")
-    
-    if not _window_ref:
-        logger.error("Window not set")
-        return None
-        
-    file_types = (
-        'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-        'All files (*.*)'
-    )
-    
-    try:
-        result = _window_ref.create_file_dialog(
-            webview.OPEN_DIALOG,
-            allow_multiple=False,
-            file_types=file_types
-        )
-        
-        if result and len(result) > 0:
-            file_path = str(Path(result[0]).resolve())
-            logger.info(f"File selected: {file_path}")
-            return file_path
-        
-        logger.info("No file selected")
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error in pickFile: {e}", exc_info=True)
-        return None
+    return show_file_dialog(_window_ref, "OPEN_DIALOG", file_types=DOCUMENT_FILE_TYPES)
+
+# Snake case version for compatibility
+pick_file = pickFile
 
-def pick_file():
-    """Snake case version for compatibility"""
-    return pickFile()
+_AVAILABLE_METHODS = (
+    "pickFile", "pick_file", "getAvailableMethods", "embedDocument", "checkLibreOffice",
+    "invalidateLibreOfficeCache"
+)
 
 def getAvailableMethods():
     """Return list of available methods"""
-    return ["pickFile", "pick_file", "getAvailableMethods", "embedDocument", "checkLibreOffice"]
+    return list(_AVAILABLE_METHODS)
 
 def embedDocument(document_path):
     """Embed document using LibreOffice native viewer"""
-    logger.info(f"embedDocument called for: {document_path}")
+    logger.debug("embedDocument called for: %s", document_path)
     
     try:
         # Import here to avoid circular dependencies
@@ -87,14 +63,13 @@ def checkLibreOffice():
     logger.info("Checking LibreOffice availability")
     
     try:
-        from app.services.document_embedder import get_document_embedder
-        embedder = get_document_embedder()
-        available = embedder.can_embed()
+        from app.services.document_embedder import probe_libreoffice
+        available, embedder_name = probe_libreoffice()
         
         return {
             "available": available,
             "platform": os.name,
-            "embedder": embedder.__class__.__name__
+            "embedder": embedder_name
         }
         
     except Exception as e:
@@ -104,6 +79,12 @@ def checkLibreOffice():
             "error": str(e)
         }
 
+def invalidateLibreOfficeCache():
+    """Forget the cached LibreOffice availability so the next check re-probes"""
+    from app.services.document_embedder import probe_libreoffice
+    probe_libreoffice.cache_clear()
+    return {"success": True}
+
 # Create the API dictionary
 api_dict = {
     "pickFile": pickFile,
@@ -111,7 +92,8 @@ api_dict = {
     "getAvailableMethods": getAvailableMethods,
     "set_window": set_window,
     "embedDocument": embedDocument,
-    "checkLibreOffice": checkLibreOffice
+    "checkLibreOffice": checkLibreOffice,
+    "invalidateLibreOfficeCache": invalidateLibreOfficeCache
 }
 
 logger.info(f"Dict API created with methods: {list(api_dict.keys())}")
\ No newline at end of file
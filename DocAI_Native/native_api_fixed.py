@@ -7,6 +7,8 @@ import logging
 import time
 from pathlib import Path
 
+from native_api_simple import show_file_dialog, DOCUMENT_FILE_TYPES
+
 logger = logging.getLogger(__name__)
 
 # Global window reference
@@ -20,45 +22,16 @@ def set_window(window):
 
 def pickFile():
     """Native file picker dialog"""
-    logger.info("pickFile called (fixed API)")
-    
-    if not _window:
-        logger.error("Window not set")
-        return None
-    
-    try:
-        import webview
-        file_types = (
-            'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-            'All files (*.*)'
-        )
-        
-        result = _window.create_file_dialog(
-            webview.OPEN_DIALOG,
-            allow_multiple=False,
-            file_types=file_types
-        )
-        
-        if result and len(result) > 0:
-            file_path = result[0]
-            logger.info(f"File selected: {file_path}")
-            return file_path
-        
-        logger.info("No file selected")
-        return None
-        
-    except Exception as e:
-        logger.error(f"Error in pickFile: {e}", exc_info=True)
-        return None
+    return show_file_dialog(_window, "OPEN_DIALOG", file_types=DOCUMENT_FILE_TYPES)
 
 def ping():
     """Simple ping to test API connectivity"""
-    logger.info("ping called")
+    logger.debug("ping called")
     return {"pong": True, "timestamp": time.time()}
 
 def checkLibreOffice():
     """Check if LibreOffice is available"""
-    logger.info("checkLibreOffice called")
+    logger.debug("checkLibreOffice called")
     return {
         "available": False,
         "message": "LibreOffice check not implemented yet"
@@ -66,7 +39,7 @@ def checkLibreOffice():
 
 def embedDocument(document_path):
     """Embed document (placeholder)"""
-    logger.info(f"embedDocument called for: {document_path}")
+    logger.debug("embedDocument called for: %s", document_path)
     return {
         "success": False,
         "message": "Document embedding not implemented yet"
@@ -76,6 +49,8 @@ def embedDocument(document_path):
 class FixedAPI:
     """Fixed API class for PyWebView"""
     
+    __slots__ = ('set_window', 'pickFile', 'ping', 'checkLibreOffice', 'embedDocument')
+    
     def __init__(self):
         # Expose all module functions as methods
         self.set_window = set_window
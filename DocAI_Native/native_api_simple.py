@@ -6,21 +6,106 @@ Minimal API to avoid pywebview introspection issues
 import os
 import logging
 import time
-from pathlib import Path
-import webview
-import platform
+import functools
 
 logger = logging.getLogger(__name__)
 
+# File dialog filters shared by the pickers
+DOCUMENT_FILE_TYPES = (
+    'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
+    'All files (*.*)'
+)
+
+# Frontend log level -> logger method; unknown levels log at info
+_LEVEL_DISPATCH = {
+    'debug': logger.debug,
+    'info': logger.info,
+    'warning': logger.warning,
+    'warn': logger.warning,
+    'error': logger.error,
+    'critical': logger.critical,
+}
+_LEVEL_DISPATCH.update({name.upper(): method for name, method in _LEVEL_DISPATCH.items()})
+
+# Methods exposed by the dict-based API variants (see build_api)
+EXPOSED_METHODS = (
+    "pickFile", "pick_file", "pickMultipleFiles", "pickFolder", "saveFile",
+    "showMessage", "getPlatformInfo", "ping", "checkLibreOffice",
+    "invalidateLibreOfficeCache", "embedDocument"
+)
+
+@functools.lru_cache(maxsize=None)
+def _platform_info():
+    """Platform details are constant for the process lifetime"""
+    import platform
+    return {
+        "system": platform.system(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "python_version": platform.python_version()
+    }
+
+def show_file_dialog(window, dialog, multiple=False, **kwargs):
+    """
+    Open a native file dialog and normalize what it returns
+    
+    Args:
+        window: pywebview window that owns the dialog
+        dialog: Name of the webview dialog constant (OPEN_DIALOG, FOLDER_DIALOG, SAVE_DIALOG)
+        multiple: Return every selected path instead of the first
+        **kwargs: Passed through to create_file_dialog
+        
+    Returns:
+        Absolute path (or list of paths when multiple), None / [] if cancelled
+    """
+    empty = [] if multiple else None
+    
+    if not window:
+        logger.error("Window not set")
+        return empty
+    
+    try:
+        import webview
+        result = window.create_file_dialog(
+            getattr(webview, dialog),
+            allow_multiple=multiple,
+            **kwargs
+        )
+        
+        if not result:
+            logger.info("Dialog cancelled")
+            return empty
+        
+        # Save dialogs return a bare string on some backends
+        if isinstance(result, str):
+            result = (result,)
+        
+        if multiple:
+            paths = list(map(os.path.abspath, result))
+            logger.info("Selected %d paths", len(paths))
+            return paths
+        
+        path = os.path.abspath(result[0])
+        logger.info("Selected: %s", path)
+        return path
+        
+    except Exception as e:
+        logger.error("Error in %s: %s", dialog, e, exc_info=True)
+        return empty
+
 class SimpleNativeAPI:
     """Simplified API exposed to JavaScript frontend"""
     
+    __slots__ = ('window', '_methods_cache')
+    
     def __init__(self):
         self.window = None
         logger.info("SimpleNativeAPI initialized (v1.7 with camelCase methods)")
-        # Log available methods on init
-        methods = [m for m in dir(self) if not m.startswith('_') and callable(getattr(self, m, None))]
-        logger.info(f"Available API methods: {methods}")
+        # Method list is fixed for the class, so compute it once
+        self._methods_cache = tuple(
+            m for m in dir(self) if not m.startswith('_') and callable(getattr(self, m, None))
+        )
+        logger.debug("Available API methods: %s", self._methods_cache)
     
     def set_window(self, window):
         """Set the webview window reference"""
@@ -30,120 +115,24 @@ class SimpleNativeAPI:
     # File Operations
     def pick_file(self):
         """Native file picker dialog"""
-        try:
-            logger.info("pick_file called")
-            
-            if not self.window:
-                logger.error("Window not set")
-                return None
-                
-            file_types = (
-                'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-                'All files (*.*)'
-            )
-            
-            result = self.window.create_file_dialog(
-                webview.OPEN_DIALOG,
-                allow_multiple=False,
-                file_types=file_types
-            )
-            
-            if result and len(result) > 0:
-                file_path = str(Path(result[0]).resolve())
-                logger.info(f"File selected: {file_path}")
-                return file_path
-            
-            logger.info("No file selected")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error in pick_file: {e}", exc_info=True)
-            return None
+        return show_file_dialog(self.window, "OPEN_DIALOG", file_types=DOCUMENT_FILE_TYPES)
     
     def pick_multiple_files(self):
         """Pick multiple files"""
-        try:
-            logger.info("pick_multiple_files called")
-            
-            if not self.window:
-                logger.error("Window not set")
-                return []
-                
-            file_types = (
-                'Document files (*.docx;*.doc;*.odt;*.pdf;*.txt)',
-                'All files (*.*)'
-            )
-            
-            result = self.window.create_file_dialog(
-                webview.OPEN_DIALOG,
-                allow_multiple=True,
-                file_types=file_types
-            )
-            
-            if result:
-                file_paths = [str(Path(f).resolve()) for f in result]
-                logger.info(f"Multiple files selected: {len(file_paths)} files")
-                return file_paths
-            
-            return []
-            
-        except Exception as e:
-            logger.error(f"Error in pick_multiple_files: {e}", exc_info=True)
-            return []
+        return show_file_dialog(self.window, "OPEN_DIALOG", multiple=True, file_types=DOCUMENT_FILE_TYPES)
     
     def pick_folder(self):
         """Native folder picker dialog"""
-        try:
-            logger.info("pick_folder called")
-            
-            if not self.window:
-                logger.error("Window not set")
-                return None
-                
-            result = self.window.create_file_dialog(webview.FOLDER_DIALOG)
-            
-            if result and len(result) > 0:
-                folder_path = str(Path(result[0]).resolve())
-                logger.info(f"Folder selected: {folder_path}")
-                return folder_path
-            
-            logger.info("No folder selected")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error in pick_folder: {e}", exc_info=True)
-            return None
+        return show_file_dialog(self.window, "FOLDER_DIALOG")
     
     def save_file(self, suggested_name="document.docx"):
         """Native save dialog"""
-        try:
-            logger.info(f"save_file called with suggested_name: {suggested_name}")
-            
-            if not self.window:
-                logger.error("Window not set")
-                return None
-                
-            result = self.window.create_file_dialog(
-                webview.SAVE_DIALOG,
-                save_filename=suggested_name
-            )
-            
-            if result:
-                save_path = str(Path(result).resolve())
-                logger.info(f"Save location selected: {save_path}")
-                return save_path
-            
-            logger.info("Save cancelled")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error in save_file: {e}", exc_info=True)
-            return None
+        return show_file_dialog(self.window, "SAVE_DIALOG", save_filename=suggested_name)
     
     def show_message(self, title, message):
         """Show native message box"""
         try:
-            logger.info(f"show_message called: {title}")
+            logger.debug("show_message called: %s", title)
             
             if not self.window:
                 logger.error("Window not set")
@@ -159,59 +148,40 @@ class SimpleNativeAPI:
     def get_platform_info(self):
         """Get platform information"""
         try:
-            return {
-                "system": platform.system(),
-                "version": platform.version(),
-                "machine": platform.machine(),
-                "python_version": platform.python_version()
-            }
+            return _platform_info()
         except Exception as e:
             logger.error(f"Error getting platform info: {e}", exc_info=True)
             return {"error": str(e)}
     
     def ping(self):
         """Simple ping to test API connectivity"""
-        logger.info("ping called")
+        logger.debug("ping called")
         return {"pong": True, "timestamp": time.time()}
     
     def log_message(self, level, message):
         """Log message from frontend"""
         try:
-            getattr(logger, level.lower())(f"Frontend: {message}")
+            _LEVEL_DISPATCH.get(level, logger.info)("Frontend: %s", message)
             return True
         except Exception as e:
             logger.error(f"Error logging message: {e}", exc_info=True)
             return False
     
     # CamelCase wrapper methods for PyWebView compatibility
-    def pickFile(self):
-        """Camel case version for PyWebView compatibility"""
-        logger.info("pickFile called (camelCase wrapper)")
-        return self.pick_file()
-    
-    def pickMultipleFiles(self):
-        """Camel case version for PyWebView compatibility"""
-        logger.info("pickMultipleFiles called (camelCase wrapper)")
-        return self.pick_multiple_files()
-    
-    def pickFolder(self):
-        """Camel case version for PyWebView compatibility"""
-        logger.info("pickFolder called (camelCase wrapper)")
-        return self.pick_folder()
-    
-    def saveFile(self, suggested_name="document.docx"):
-        """Camel case version for PyWebView compatibility"""
-        logger.info(f"saveFile called with {suggested_name} (camelCase wrapper)")
-        return self.save_file(suggested_name)
+    # (the pickers are plain aliases, avoiding an extra call layer)
+    pickFile = pick_file
+    pickMultipleFiles = pick_multiple_files
+    pickFolder = pick_folder
+    saveFile = save_file
     
     def showMessage(self, title, message):
         """Camel case version for PyWebView compatibility"""
-        logger.info("showMessage called (camelCase wrapper)")
+        logger.debug("showMessage called (camelCase wrapper)")
         return self.show_message(title, message)
     
     def getPlatformInfo(self):
         """Camel case version for PyWebView compatibility"""
-        logger.info("getPlatformInfo called (camelCase wrapper)")
+        logger.debug("getPlatformInfo called (camelCase wrapper)")
         return self.get_platform_info()
     
     def logMessage(self, level, message):
@@ -220,27 +190,22 @@ class SimpleNativeAPI:
     
     def getAvailableMethods(self):
         """Return list of available API methods for debugging"""
-        methods = []
-        for method in dir(self):
-            if not method.startswith('_') and callable(getattr(self, method)):
-                methods.append(method)
-        logger.info(f"Available API methods: {methods}")
-        return methods
+        return list(self._methods_cache)
     
     # LibreOffice Integration Methods
     def checkLibreOffice(self):
         """Check if LibreOffice is available for embedding"""
-        logger.info("checkLibreOffice called")
+        logger.debug("checkLibreOffice called")
         
         try:
-            from app.services.document_embedder import get_document_embedder
-            embedder = get_document_embedder()
-            available = embedder.can_embed()
+            import platform
+            from app.services.document_embedder import probe_libreoffice
+            available, embedder_name = probe_libreoffice()
             
             result = {
                 "available": available,
                 "platform": platform.system(),
-                "embedder": embedder.__class__.__name__
+                "embedder": embedder_name
             }
             logger.info(f"LibreOffice check result: {result}")
             return result
@@ -252,9 +217,15 @@ class SimpleNativeAPI:
                 "error": str(e)
             }
     
+    def invalidateLibreOfficeCache(self):
+        """Forget the cached LibreOffice availability so the next check re-probes"""
+        from app.services.document_embedder import probe_libreoffice
+        probe_libreoffice.cache_clear()
+        return {"success": True}
+    
     def embedDocument(self, document_path):
         """Embed document using LibreOffice native viewer"""
-        logger.info(f"embedDocument called for: {document_path}")
+        logger.debug("embedDocument called for: %s", document_path)
         
         try:
             if not self.window:
@@ -270,4 +241,22 @@ class SimpleNativeAPI:
             
         except Exception as e:
             logger.error(f"Error embedding document: {e}", exc_info=True)
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e)}
+
+
+def build_api(api, set_window, exclude=()):
+    """
+    Build a dict-based API from the bound methods of a SimpleNativeAPI
+    
+    Args:
+        api: SimpleNativeAPI instance the entries delegate to
+        set_window: Callable stored under "set_window"
+        exclude: Method names to leave out of the mapping
+    """
+    names = tuple(name for name in EXPOSED_METHODS if name not in exclude)
+    method_names = names + ("getAvailableMethods",)
+    
+    exposed = {name: getattr(api, name) for name in names}
+    exposed["getAvailableMethods"] = lambda: list(method_names)
+    exposed["set_window"] = set_window
+    return exposed
@@ -3,11 +3,33 @@
 Simple script to test opening documents with LibreOffice
 """
 
+import os
 import sys
+import shutil
+import functools
 import subprocess
 import platform
 from pathlib import Path
 
+@functools.lru_cache(maxsize=None)
+def _find_soffice(system):
+    """Locate the LibreOffice executable once per platform"""
+    if system == "Linux":
+        # One PATH lookup per name, then the usual install locations
+        return (
+            next((found for found in map(shutil.which, ('libreoffice', 'soffice')) if found), None)
+            or next((path for path in ('/usr/bin/libreoffice', '/usr/bin/soffice') if os.path.exists(path)), None)
+        )
+    elif system == "Windows":
+        # Common LibreOffice paths on Windows
+        for path in (
+            r"C:\Program Files\LibreOffice\program\soffice.exe",
+            r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
+        ):
+            if os.path.exists(path):
+                return path
+    return None
+
 def open_with_libreoffice(file_path):
     """Open a document with LibreOffice"""
     file_path = Path(file_path)
@@ -19,29 +41,21 @@ def open_with_libreoffice(file_path):
     system = platform.system()
     
     try:
-        if system == "Linux":
-            # Try different LibreOffice commands
-            commands = ['libreoffice', 'soffice', '/usr/bin/libreoffice', '/usr/bin/soffice']
-            for cmd in commands:
-                try:
-                    subprocess.run([cmd, '--view', str(file_path)])
-                    print(f"Opened with {cmd}")
+        if system in ("Linux", "Windows"):
+            soffice = _find_soffice(system)
+            if soffice:
+                # Don't block for the lifetime of the viewer window
+                process = subprocess.Popen(
+                    [soffice, '--view', '--norestore', '--nologo', '--nofirststartwizard', str(file_path)],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+                if process.poll() is None:
+                    print(f"Opened with {soffice}")
                     return True
-                except FileNotFoundError:
-                    continue
+                print(f"{soffice} exited immediately with code {process.returncode}")
             
-        elif system == "Windows":
-            # Common LibreOffice paths on Windows
-            paths = [
-                r"C:\Program Files\LibreOffice\program\soffice.exe",
-                r"C:\Program Files (x86)\LibreOffice\program\soffice.exe"
-            ]
-            for path in paths:
-                if Path(path).exists():
-                    subprocess.run([path, '--view', str(file_path)])
-                    print(f"Opened with {path}")
-                    return True
-                    
         elif system == "Darwin":  # macOS
             subprocess.run(['open', '-a', 'LibreOffice', str(file_path)])
             print("Opened with LibreOffice on macOS")
@@ -53,11 +67,12 @@ def open_with_libreoffice(file_path):
     # Fallback - open with system default
     try:
         if system == "Linux":
-            subprocess.run(['xdg-open', str(file_path)])
+            subprocess.Popen(['xdg-open', str(file_path)])
         elif system == "Windows":
-            subprocess.run(['start', '', str(file_path)], shell=True)
+            # ShellExecute directly, without spawning cmd.exe for 'start'
+            os.startfile(str(file_path))
         elif system == "Darwin":
-            subprocess.run(['open', str(file_path)])
+            subprocess.Popen(['open', str(file_path)])
         print("Opened with system default application")
         return True
     except Exception as e:
@@ -4,54 +4,136 @@ Simple LibreOffice Launcher for DocAI Native
 Adds "Open in LibreOffice" functionality
 """
 
+import os
+import shutil
 import subprocess
+import threading
 import logging
-from pathlib import Path
+from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Resolved once at import; LibreOfficeLauncher.invalidate_cache() re-probes
+_SOFFICE_PATH = shutil.which('soffice')
+
+# Extensions LibreOffice can open
+_SUPPORTED_FORMATS = frozenset({
+    '.odt', '.ods', '.odp', '.odg',  # OpenDocument
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',  # Microsoft
+    '.rtf', '.txt', '.csv',  # Text formats
+    '.pdf'  # PDF (view only)
+})
+
+@dataclass(slots=True)
+class OpenResult:
+    """Outcome of LibreOfficeLauncher.open_document"""
+    success: bool
+    message: str = ''
+    error: str = ''
+    pid: int = 0
+    master_pid: int = 0
+    
+    def to_dict(self):
+        """Plain dict for the pywebview bridge, in the shape the JS side expects"""
+        if self.success:
+            return {
+                "success": True,
+                "message": self.message,
+                "pid": self.pid,
+                "master_pid": self.master_pid
+            }
+        return {"success": False, "error": self.error}
+
 class LibreOfficeLauncher:
     """Simple launcher for opening documents in LibreOffice"""
     
+    # Long-lived soffice that later opens hand off to instead of cold-starting
+    _master = None
+    _master_lock = threading.Lock()
+    
     @staticmethod
     def check_libreoffice():
         """Check if LibreOffice is installed"""
-        try:
-            result = subprocess.run(['which', 'soffice'], capture_output=True)
-            return result.returncode == 0
-        except:
+        return _SOFFICE_PATH is not None
+    
+    @staticmethod
+    def invalidate_cache():
+        """Look up soffice on PATH again (e.g. after installing LibreOffice)"""
+        global _SOFFICE_PATH
+        _SOFFICE_PATH = shutil.which('soffice')
+        return _SOFFICE_PATH is not None
+    
+    @classmethod
+    def _ensure_master(cls):
+        """Start the long-lived soffice instance if it is not running"""
+        with cls._master_lock:
+            if cls._master is not None and cls._master.poll() is None:
+                return cls._master
+            
+            # --invisible rather than --headless: documents handed to this
+            # instance must still open in a visible window
+            cls._master = subprocess.Popen(
+                [_SOFFICE_PATH, '--invisible', '--nologo', '--norestore'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+            logger.info(f"Started LibreOffice master process (PID: {cls._master.pid})")
+            return cls._master
+    
+    @classmethod
+    def prewarm(cls):
+        """
+        Start the master in the background so the first open hands off to a
+        warm instance; call once at app startup
+        """
+        if not cls.check_libreoffice():
             return False
+        
+        threading.Thread(target=cls._ensure_master, daemon=True, name="LibreOfficePrewarm").start()
+        return True
+    
+    @classmethod
+    def shutdown(cls):
+        """Terminate the long-lived soffice instance"""
+        with cls._master_lock:
+            if cls._master is not None and cls._master.poll() is None:
+                cls._master.terminate()
+                try:
+                    cls._master.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    cls._master.kill()
+            cls._master = None
     
     @staticmethod
-    def open_document(file_path, mode='view'):
+    def open_document(file_path, mode='view', exec_process=False):
         """
         Open document in LibreOffice
         
         Args:
             file_path: Path to the document
             mode: 'view' for read-only, 'edit' for editing
+            exec_process: Replace the current process with soffice instead of
+                spawning a child (only for standalone script use)
         
         Returns:
-            dict with success status and message
+            OpenResult with success status and message (does not return on exec);
+            use to_dict() when handing it to JavaScript
         """
         try:
             if not LibreOfficeLauncher.check_libreoffice():
-                return {
-                    "success": False,
-                    "error": "LibreOffice not installed"
-                }
+                return OpenResult(False, error="LibreOffice not installed")
             
-            # Ensure file exists
-            file_path = Path(file_path)
-            if not file_path.exists():
-                return {
-                    "success": False,
-                    "error": f"File not found: {file_path}"
-                }
+            # Ensure file exists (single stat on the normalized path)
+            abs_path = os.path.abspath(os.fspath(file_path))
+            try:
+                os.stat(abs_path)
+            except FileNotFoundError:
+                return OpenResult(False, error=f"File not found: {abs_path}")
             
-            # Build command
+            # Build command (absolute path skips the PATH search on exec)
             cmd = [
-                'soffice',
+                _SOFFICE_PATH,
                 '--nologo',
                 '--norestore'
             ]
@@ -59,34 +141,37 @@ class LibreOfficeLauncher:
             if mode == 'view':
                 cmd.append('--view')
             
-            cmd.append(str(file_path.absolute()))
+            cmd.append(abs_path)
+            
+            if exec_process:
+                # Nothing left to do in Python: become soffice, no fork
+                logging.shutdown()
+                os.execv(_SOFFICE_PATH, cmd)
+            
+            # soffice is single-instance per user profile: a later invocation
+            # on the same profile forwards the document to the running master
+            # over the profile's IPC channel and exits, skipping the cold start
+            master = LibreOfficeLauncher._ensure_master()
             
             # Launch LibreOffice
-            process = subprocess.Popen(cmd)
-            logger.info(f"Launched LibreOffice for {file_path.name} (PID: {process.pid})")
+            process = subprocess.Popen(cmd, start_new_session=True)
+            logger.info(f"Launched LibreOffice for {os.path.basename(abs_path)} (PID: {process.pid})")
             
-            return {
-                "success": True,
-                "message": f"Opened in LibreOffice ({mode} mode)",
-                "pid": process.pid
-            }
+            return OpenResult(
+                True,
+                message=f"Opened in LibreOffice ({mode} mode)",
+                pid=process.pid,
+                master_pid=master.pid
+            )
             
         except Exception as e:
             logger.error(f"Error launching LibreOffice: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            return OpenResult(False, error=str(e))
     
     @staticmethod
     def get_supported_formats():
-        """Get list of formats that can be opened in LibreOffice"""
-        return [
-            '.odt', '.ods', '.odp', '.odg',  # OpenDocument
-            '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',  # Microsoft
-            '.rtf', '.txt', '.csv',  # Text formats
-            '.pdf'  # PDF (view only)
-        ]
+        """Get the set of formats that can be opened in LibreOffice"""
+        return _SUPPORTED_FORMATS
 
 
 # Example usage for integration into DocAI Native
@@ -97,7 +182,7 @@ def add_to_docai_native_api():
     
     def open_in_libreoffice(self, file_path, mode='view'):
         """Open document in external LibreOffice window"""
-        return LibreOfficeLauncher.open_document(file_path, mode)
+        return LibreOfficeLauncher.open_document(file_path, mode).to_dict()
     
     # Add to your HTML/JavaScript:
     """
@@ -124,9 +209,10 @@ if __name__ == '__main__':
     
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
-        result = LibreOfficeLauncher.open_document(file_path)
+        # Only returns if validation or exec failed
+        result = LibreOfficeLauncher.open_document(file_path, exec_process=True)
         print(f"Result: {result}")
     else:
         print("Usage: python simple_libreoffice_launcher.py <file_path>")
-        print(f"Supported formats: {', '.join(LibreOfficeLauncher.get_supported_formats())}")
+        print(f"Supported formats: {', '.join(sorted(LibreOfficeLauncher.get_supported_formats()))}")
         print(f"LibreOffice installed: {LibreOfficeLauncher.check_libreoffice()}")
\ No newline at end of file
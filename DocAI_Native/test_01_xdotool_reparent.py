@@ -7,37 +7,54 @@ Uses xdotool to reparent LibreOffice window into a container
 import os
 import time
 import subprocess
-import tkinter as tk
 from pathlib import Path
 
+try:
+    from Xlib import X, display
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+from x11_container import (
+    LO_DOCUMENT_NAME_RE, LO_WM_CLASS, create_container_window, scan_client_windows,
+    wait_for_event, wait_for_map_event
+)
+
 class EmbeddingTest:
+    # soffice arguments shared by every run; only the document varies
+    _BASE_CMD = ('soffice', '--nologo', '--norestore', '--nodefault', '--view')
+    
     def __init__(self, config, test_dir, logger):
         self.config = config
         self.test_dir = test_dir
         self.logger = logger
+        self.container_window = None
         self.container_window_id = None
         self.lo_process = None
         self.lo_window_id = None
+        self.display = None
         
     def create_container_window(self):
-        """Create a container window using tkinter"""
+        """Create a container window using Xlib"""
         self.logger.info("Creating container window...")
         
-        # Create tkinter window
-        self.root = tk.Tk()
-        self.root.title("LibreOffice Container - Test 01")
-        self.root.geometry(f"{self.config['container_size']['width']}x{self.config['container_size']['height']}")
-        
-        # Add label
-        label = tk.Label(self.root, text="LibreOffice should appear here", bg='lightblue')
-        label.pack(fill=tk.BOTH, expand=True)
+        if not XLIB_AVAILABLE:
+            self.logger.error("python-xlib not available")
+            return False
         
-        # Update to ensure window is created
-        self.root.update()
+        try:
+            self.container_window = create_container_window(
+                self._get_display(),
+                self.config['container_size']['width'],
+                self.config['container_size']['height'],
+                "LibreOffice Container - Test 01"
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to create container window: {e}")
+            return False
         
-        # Get window ID
-        window_id = self.root.winfo_id()
-        self.container_window_id = hex(window_id)
+        # xdotool takes the container as a hex XID
+        self.container_window_id = hex(self.container_window.id)
         self.logger.info(f"Container window created with ID: {self.container_window_id}")
         
         return True
@@ -48,60 +65,44 @@ class EmbeddingTest:
         
         test_file = Path(__file__).parent / self.config['test_document']
         
-        env = os.environ.copy()
-        env['SAL_USE_VCLPLUGIN'] = vcl_plugin
-        
-        cmd = [
-            'soffice',
-            '--nologo',
-            '--norestore',
-            '--nodefault',
-            '--view',
-            str(test_file)
-        ]
+        env = {**os.environ, 'SAL_USE_VCLPLUGIN': vcl_plugin}
+        cmd = [*self._BASE_CMD, str(test_file)]
         
         try:
-            self.lo_process = subprocess.Popen(cmd, env=env)
+            self.lo_process = subprocess.Popen(cmd, env=env, start_new_session=True)
             self.logger.info(f"LibreOffice launched with PID: {self.lo_process.pid}")
             return True
         except Exception as e:
             self.logger.error(f"Failed to launch LibreOffice: {e}")
             return False
     
+    def _get_display(self):
+        """Open the Xlib display on first use"""
+        if self.display is None:
+            self.display = display.Display()
+        return self.display
+    
     def find_libreoffice_window(self, wait_time):
-        """Find LibreOffice window using xdotool"""
-        self.logger.info(f"Waiting {wait_time}s for LibreOffice window...")
-        time.sleep(wait_time)
+        """Find LibreOffice window using Xlib, waking on map events instead of sleeping"""
+        self.logger.info(f"Waiting up to {wait_time}s for LibreOffice window...")
+        deadline = time.monotonic() + wait_time
         
         try:
-            # Search for LibreOffice windows
-            result = subprocess.run(
-                ['xdotool', 'search', '--class', 'libreoffice'],
-                capture_output=True,
-                text=True
+            xdisplay = self._get_display()
+            # Ad-hoc subscription: MapNotify for every new top-level window
+            # plus PropertyNotify for _NET_CLIENT_LIST updates
+            xdisplay.screen().root.change_attributes(
+                event_mask=X.SubstructureNotifyMask | X.PropertyChangeMask
             )
+            xdisplay.sync()
             
-            if result.returncode == 0 and result.stdout.strip():
-                window_ids = result.stdout.strip().split('\n')
-                self.logger.info(f"Found {len(window_ids)} LibreOffice windows")
+            while True:
+                if self._select_libreoffice_window():
+                    return True
                 
-                # Get window names to find the right one
-                for wid in window_ids:
-                    name_result = subprocess.run(
-                        ['xdotool', 'getwindowname', wid],
-                        capture_output=True,
-                        text=True
-                    )
-                    
-                    if name_result.returncode == 0:
-                        window_name = name_result.stdout.strip()
-                        self.logger.info(f"Window {wid}: {window_name}")
-                        
-                        # Skip splash screens
-                        if 'test_embed' in window_name or 'LibreOffice' in window_name and 'Start' not in window_name:
-                            self.lo_window_id = wid
-                            self.logger.info(f"Selected LibreOffice window: {wid}")
-                            return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not wait_for_map_event(xdisplay, remaining):
+                    break
                 
             self.logger.warning("No suitable LibreOffice window found")
             return False
@@ -110,6 +111,25 @@ class EmbeddingTest:
             self.logger.error(f"Error finding LibreOffice window: {e}")
             return False
     
+    def _select_libreoffice_window(self):
+        """Scan top-level windows for the LibreOffice document window"""
+        # Query the X server directly instead of spawning xdotool per window
+        for window, _, wm_class, window_name in scan_client_windows(self._get_display()):
+            if LO_WM_CLASS not in wm_class.lower():
+                continue
+            
+            window_name = window_name or ''
+            wid = hex(window.id)
+            self.logger.info(f"Window {wid}: {window_name}")
+            
+            # Skip splash screens
+            if LO_DOCUMENT_NAME_RE.search(window_name):
+                self.lo_window_id = wid
+                self.logger.info(f"Selected LibreOffice window: {wid}")
+                return True
+        
+        return False
+    
     def reparent_window(self):
         """Reparent LibreOffice window into container using xdotool"""
         if not self.lo_window_id or not self.container_window_id:
@@ -119,39 +139,37 @@ class EmbeddingTest:
         try:
             self.logger.info(f"Reparenting {self.lo_window_id} into {self.container_window_id}")
             
-            # First, remove window decorations
-            subprocess.run([
-                'xdotool', 'set_window', '--overrideredirect', '1', self.lo_window_id
-            ])
+            # Ask for StructureNotify so we hear when the reparent settles
+            xdisplay = self._get_display()
+            lo_window = xdisplay.create_resource_object('window', int(self.lo_window_id, 16))
+            lo_window.change_attributes(event_mask=X.StructureNotifyMask)
+            xdisplay.sync()
             
-            # Reparent the window
+            # One xdotool process chaining all four commands: remove window
+            # decorations, reparent, move to 0,0 within container, fill it
             result = subprocess.run([
-                'xdotool', 'windowreparent', self.lo_window_id, self.container_window_id
-            ], capture_output=True, text=True)
+                'xdotool',
+                'set_window', '--overrideredirect', '1', self.lo_window_id,
+                'windowreparent', self.lo_window_id, self.container_window_id,
+                'windowmove', '--relative', self.lo_window_id, '0', '0',
+                'windowsize', self.lo_window_id,
+                str(self.config['container_size']['width']),
+                str(self.config['container_size']['height'])
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
             
             if result.returncode != 0:
                 self.logger.error(f"Reparent failed: {result.stderr}")
                 return False
             
-            # Move to position 0,0 within container
-            subprocess.run([
-                'xdotool', 'windowmove', '--relative', self.lo_window_id, '0', '0'
-            ])
-            
-            # Resize to fill container
-            subprocess.run([
-                'xdotool', 'windowsize', self.lo_window_id,
-                str(self.config['container_size']['width']),
-                str(self.config['container_size']['height'])
-            ])
-            
             self.logger.info("Window reparented successfully")
             
-            # Update tkinter window to show changes
-            self.root.update()
-            
-            # Give it a moment to settle
-            time.sleep(2)
+            # Wait for the server to confirm the new geometry instead of sleeping
+            if not wait_for_event(
+                xdisplay,
+                lambda ev: ev.type == X.ConfigureNotify and ev.window.id == lo_window.id,
+                2.0
+            ):
+                self.logger.warning("No ConfigureNotify within 2s, verifying anyway")
             
             # Verify reparenting
             return self.verify_reparenting()
@@ -163,31 +181,18 @@ class EmbeddingTest:
     def verify_reparenting(self):
         """Verify that reparenting was successful"""
         try:
-            # Get window info
-            result = subprocess.run(
-                ['xwininfo', '-id', self.lo_window_id],
-                capture_output=True,
-                text=True
-            )
+            xdisplay = self._get_display()
+            window = xdisplay.create_resource_object('window', int(self.lo_window_id, 16))
+            parent_id = window.query_tree().parent.id
+            self.logger.info(f"Parent window ID: {hex(parent_id)}")
+            
+            if parent_id == int(self.container_window_id, 16):
+                self.logger.info("✓ Reparenting verified!")
+                return True
+            
+            self.logger.warning("Parent window doesn't match container")
+            return False
             
-            if result.returncode == 0:
-                output = result.stdout
-                
-                # Check if parent is our container
-                for line in output.split('\n'):
-                    if 'Parent window id:' in line:
-                        parent_id = line.split(':')[1].strip()
-                        self.logger.info(f"Parent window ID: {parent_id}")
-                        
-                        # Convert container ID to same format for comparison
-                        container_id_int = int(self.container_window_id, 16)
-                        if parent_id == hex(container_id_int) or parent_id == str(container_id_int):
-                            self.logger.info("✓ Reparenting verified!")
-                            return True
-                
-                self.logger.warning("Parent window doesn't match container")
-                return False
-                
         except Exception as e:
             self.logger.error(f"Error verifying reparenting: {e}")
             return False
@@ -198,25 +203,35 @@ class EmbeddingTest:
             self.lo_process.terminate()
             self.lo_process = None
         
-        if hasattr(self, 'root'):
+        if self.container_window:
             try:
-                self.root.destroy()
+                self.container_window.destroy()
+                self.display.flush()
             except:
                 pass
+            self.container_window = None
+        
+        if self.display:
+            try:
+                self.display.close()
+            except:
+                pass
+            self.display = None
     
     def run(self, vcl_plugin, wait_time):
         """Run the test with specified parameters"""
         self.logger.info(f"Running xdotool reparent test (VCL: {vcl_plugin}, wait: {wait_time}s)")
         
         try:
+            # Launch LibreOffice first; Popen returns immediately, so its
+            # multi-second cold start overlaps with building the container
+            if not self.launch_libreoffice(vcl_plugin):
+                return {'success': False, 'error': 'Failed to launch LibreOffice'}
+            
             # Create container window
             if not self.create_container_window():
                 return {'success': False, 'error': 'Failed to create container window'}
             
-            # Launch LibreOffice
-            if not self.launch_libreoffice(vcl_plugin):
-                return {'success': False, 'error': 'Failed to launch LibreOffice'}
-            
             # Find LibreOffice window
             if not self.find_libreoffice_window(wait_time):
                 return {'success': False, 'error': 'Failed to find LibreOffice window'}
@@ -226,7 +241,8 @@ class EmbeddingTest:
                 return {'success': False, 'error': 'Failed to reparent window'}
             
             # Keep window open for screenshot
-            time.sleep(3)
+            if self.config.get('screenshot_enabled'):
+                time.sleep(3)
             
             return {
                 'success': True,
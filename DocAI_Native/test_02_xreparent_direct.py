@@ -10,13 +10,20 @@ import subprocess
 from pathlib import Path
 
 try:
-    from Xlib import X, display
-    from Xlib.error import BadWindow
+    from Xlib import X
     XLIB_AVAILABLE = True
 except ImportError:
     XLIB_AVAILABLE = False
 
+from x11_container import (
+    LO_DOCUMENT_NAME_RE, LO_WM_CLASS, create_container_window, get_display,
+    scan_client_windows, wait_for_event, wait_for_map_event
+)
+
 class EmbeddingTest:
+    # soffice arguments shared by every run; only the document varies
+    _BASE_CMD = ('soffice', '--nologo', '--norestore', '--nodefault', '--view')
+    
     def __init__(self, config, test_dir, logger):
         self.config = config
         self.test_dir = test_dir
@@ -35,32 +42,23 @@ class EmbeddingTest:
         self.logger.info("Creating X11 container window...")
         
         try:
-            # Open X display
-            self.display = display.Display()
-            screen = self.display.screen()
-            root = screen.root
+            # Reuse the process-wide X display
+            self.display = get_display()
+            
+            # Get MapNotify for new top-level windows, and PropertyNotify for
+            # _NET_CLIENT_LIST, so the LibreOffice window search can wake up
+            # as soon as it appears
+            self.display.screen().root.change_attributes(
+                event_mask=X.SubstructureNotifyMask | X.PropertyChangeMask
+            )
             
-            # Create window
-            self.container_window = root.create_window(
-                50, 50,  # x, y
+            self.container_window = create_container_window(
+                self.display,
                 self.config['container_size']['width'],
                 self.config['container_size']['height'],
-                2,  # border width
-                screen.root_depth,
-                X.InputOutput,
-                X.CopyFromParent,
-                background_pixel=screen.white_pixel,
-                event_mask=X.ExposureMask | X.KeyPressMask | X.StructureNotifyMask
+                "LibreOffice Container - Test 02"
             )
             
-            # Set window properties
-            self.container_window.set_wm_name("LibreOffice Container - Test 02")
-            self.container_window.set_wm_class("libreoffice_container", "LibreOfficeContainer")
-            
-            # Map (show) the window
-            self.container_window.map()
-            self.display.sync()
-            
             self.logger.info(f"Container window created with ID: 0x{self.container_window.id:x}")
             return True
             
@@ -74,20 +72,11 @@ class EmbeddingTest:
         
         test_file = Path(__file__).parent / self.config['test_document']
         
-        env = os.environ.copy()
-        env['SAL_USE_VCLPLUGIN'] = vcl_plugin
-        
-        cmd = [
-            'soffice',
-            '--nologo',
-            '--norestore',
-            '--nodefault',
-            '--view',
-            str(test_file)
-        ]
+        env = {**os.environ, 'SAL_USE_VCLPLUGIN': vcl_plugin}
+        cmd = [*self._BASE_CMD, str(test_file)]
         
         try:
-            self.lo_process = subprocess.Popen(cmd, env=env)
+            self.lo_process = subprocess.Popen(cmd, env=env, start_new_session=True)
             self.logger.info(f"LibreOffice launched with PID: {self.lo_process.pid}")
             return True
         except Exception as e:
@@ -95,42 +84,21 @@ class EmbeddingTest:
             return False
     
     def find_libreoffice_window(self, wait_time):
-        """Find LibreOffice window using Xlib"""
+        """Find LibreOffice window using Xlib, waking on map events instead of sleeping"""
         if not XLIB_AVAILABLE or not self.display:
             return False
         
-        self.logger.info(f"Waiting {wait_time}s for LibreOffice window...")
-        time.sleep(wait_time)
+        self.logger.info(f"Waiting up to {wait_time}s for LibreOffice window...")
+        deadline = time.monotonic() + wait_time
         
         try:
-            # Get root window
-            root = self.display.screen().root
-            
-            # Query window tree
-            tree = root.query_tree()
-            
-            for window in tree.children:
-                try:
-                    # Get window properties
-                    wm_class = window.get_wm_class()
-                    wm_name = window.get_wm_name()
-                    
-                    if wm_class and 'libreoffice' in str(wm_class).lower():
-                        self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
-                        
-                        # Skip splash screens
-                        if wm_name and ('test_embed' in wm_name or 
-                                      ('LibreOffice' in wm_name and 'Start' not in wm_name)):
-                            self.lo_window = window
-                            self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
-                            return True
-                            
-                except BadWindow:
-                    # Window disappeared, continue
-                    continue
-                except Exception as e:
-                    self.logger.debug(f"Error checking window: {e}")
-                    continue
+            while True:
+                if self._select_libreoffice_window():
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not wait_for_map_event(self.display, remaining):
+                    break
             
             self.logger.warning("No suitable LibreOffice window found")
             return False
@@ -139,6 +107,21 @@ class EmbeddingTest:
             self.logger.error(f"Error finding LibreOffice window: {e}")
             return False
     
+    def _select_libreoffice_window(self):
+        """Scan top-level windows for the LibreOffice document window"""
+        # Managed windows only, rather than every window in the tree
+        for window, _, wm_class, wm_name in scan_client_windows(self.display):
+            if LO_WM_CLASS in wm_class.lower():
+                self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
+                
+                # Skip splash screens
+                if wm_name and LO_DOCUMENT_NAME_RE.search(wm_name):
+                    self.lo_window = window
+                    self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
+                    return True
+        
+        return False
+    
     def reparent_window(self):
         """Reparent LibreOffice window using XReparentWindow"""
         if not self.lo_window or not self.container_window:
@@ -148,9 +131,11 @@ class EmbeddingTest:
         try:
             self.logger.info(f"Reparenting 0x{self.lo_window.id:x} into 0x{self.container_window.id:x}")
             
+            # Ask for StructureNotify so we hear when the reparent settles
+            self.lo_window.change_attributes(event_mask=X.StructureNotifyMask)
+            
             # Unmap window first (hide it)
             self.lo_window.unmap()
-            self.display.sync()
             
             # Remove window manager decorations
             # Set override redirect to bypass window manager
@@ -168,13 +153,20 @@ class EmbeddingTest:
             # Map window again (show it)
             self.lo_window.map()
             
-            # Ensure all X11 commands are executed
+            # One round-trip for the whole batch; the server applies the
+            # buffered requests in order
             self.display.sync()
             
             self.logger.info("Window reparented successfully")
             
-            # Give it a moment to settle
-            time.sleep(2)
+            # Wait for the server to confirm the new geometry instead of sleeping
+            lo_id = self.lo_window.id
+            if not wait_for_event(
+                self.display,
+                lambda ev: ev.type == X.ConfigureNotify and ev.window.id == lo_id,
+                2.0
+            ):
+                self.logger.warning("No ConfigureNotify within 2s, verifying anyway")
             
             # Verify reparenting
             return self.verify_reparenting()
@@ -217,14 +209,13 @@ class EmbeddingTest:
         if self.container_window:
             try:
                 self.container_window.destroy()
+                # The display stays open for the next run; push the destroy out now
+                self.display.flush()
             except:
                 pass
+            self.container_window = None
         
-        if self.display:
-            try:
-                self.display.close()
-            except:
-                pass
+        self.lo_window = None
     
     def run(self, vcl_plugin, wait_time):
         """Run the test with specified parameters"""
@@ -234,14 +225,15 @@ class EmbeddingTest:
         self.logger.info(f"Running XReparentWindow test (VCL: {vcl_plugin}, wait: {wait_time}s)")
         
         try:
+            # Launch LibreOffice first; Popen returns immediately, so its
+            # multi-second cold start overlaps with building the container
+            if not self.launch_libreoffice(vcl_plugin):
+                return {'success': False, 'error': 'Failed to launch LibreOffice'}
+            
             # Create container window
             if not self.create_container_window():
                 return {'success': False, 'error': 'Failed to create container window'}
             
-            # Launch LibreOffice
-            if not self.launch_libreoffice(vcl_plugin):
-                return {'success': False, 'error': 'Failed to launch LibreOffice'}
-            
             # Find LibreOffice window
             if not self.find_libreoffice_window(wait_time):
                 return {'success': False, 'error': 'Failed to find LibreOffice window'}
@@ -251,7 +243,8 @@ class EmbeddingTest:
                 return {'success': False, 'error': 'Failed to reparent window'}
             
             # Keep window open for screenshot
-            time.sleep(3)
+            if self.config.get('screenshot_enabled'):
+                time.sleep(3)
             
             return {
                 'success': True,
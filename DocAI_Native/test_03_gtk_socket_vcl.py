@@ -5,7 +5,6 @@ Uses GTK Socket/Plug mechanism with different SAL_USE_VCLPLUGIN values
 """
 
 import os
-import time
 import subprocess
 from pathlib import Path
 
@@ -18,6 +17,16 @@ try:
 except ImportError:
     GTK_AVAILABLE = False
 
+from x11_container import XLIB_AVAILABLE, find_windows_by_pid, get_display, reap
+
+def _drain(max_iter=64):
+    """Dispatch pending GTK events without blocking, at most max_iter of them"""
+    # Capped so events queued by the handlers themselves cannot keep it going
+    for _ in range(max_iter):
+        if not Gtk.events_pending():
+            return
+        Gtk.main_iteration_do(False)
+
 class EmbeddingTest:
     def __init__(self, config, test_dir, logger):
         self.config = config
@@ -28,6 +37,13 @@ class EmbeddingTest:
         self.socket_id = None
         self.lo_process = None
         self.plug_added = False
+        self.loop = None
+        self._timeout_id = None
+        self._exit_watch_id = None
+        # The document and the arguments shared by the launch approaches
+        # are fixed for the test, so build them once
+        self._test_file = str(Path(__file__).parent / config['test_document'])
+        self._view_args = ('--nologo', '--norestore', '--view', self._test_file)
         
     def create_container_window(self):
         """Create a GTK window with socket"""
@@ -73,9 +89,8 @@ class EmbeddingTest:
             self.socket_id = self.socket.get_id()
             self.logger.info(f"GTK Socket created with ID: 0x{self.socket_id:x}")
             
-            # Process events to ensure window is displayed
-            while Gtk.events_pending():
-                Gtk.main_iteration()
+            # Events (including plug-added) are dispatched while this runs
+            self.loop = GLib.MainLoop()
             
             return True
             
@@ -87,6 +102,7 @@ class EmbeddingTest:
         """Called when a plug is added to the socket"""
         self.logger.info("✓ Plug added to socket!")
         self.plug_added = True
+        self.loop.quit()
     
     def on_plug_removed(self, socket):
         """Called when a plug is removed from the socket"""
@@ -98,12 +114,8 @@ class EmbeddingTest:
         if self.lo_process:
             self.lo_process.terminate()
     
-    def launch_libreoffice(self, vcl_plugin):
-        """Launch LibreOffice with specified VCL plugin"""
-        self.logger.info(f"Launching LibreOffice with VCL plugin: {vcl_plugin}")
-        
-        test_file = Path(__file__).parent / self.config['test_document']
-        
+    def _launch_approaches(self, vcl_plugin):
+        """Yield the (cmd, env) pairs to try, in order"""
         env = os.environ.copy()
         env['SAL_USE_VCLPLUGIN'] = vcl_plugin
         
@@ -111,46 +123,43 @@ class EmbeddingTest:
         if vcl_plugin.startswith('gtk'):
             env['GDK_BACKEND'] = 'x11'
         
-        # Try different approaches
-        approaches = [
-            # Approach 1: Direct socket ID as parent
-            [
-                'soffice',
-                f'--parent={self.socket_id}',
-                '--nologo',
-                '--norestore',
-                '--view',
-                str(test_file)
-            ],
-            # Approach 2: Socket ID as display
-            [
-                'soffice',
-                f'--display=:{self.socket_id}',
-                '--nologo',
-                '--norestore',
-                '--view',
-                str(test_file)
-            ],
-            # Approach 3: Standard launch (for reparenting)
-            [
-                'soffice',
-                '--nologo',
-                '--norestore',
-                '--nodefault',
-                '--view',
-                str(test_file)
-            ]
-        ]
+        # Approach 1: Direct socket ID as parent
+        yield ('soffice', f'--parent={self.socket_id}', *self._view_args), env
+        
+        # Approach 2: Socket ID as display
+        yield ('soffice', f'--display=:{self.socket_id}', *self._view_args), env
         
-        for i, cmd in enumerate(approaches):
+        # Approach 3: Standard launch (for reparenting)
+        yield ('soffice', '--nologo', '--norestore', '--nodefault', '--view', self._test_file), env
+    
+    def launch_libreoffice(self, vcl_plugin):
+        """Launch LibreOffice with specified VCL plugin"""
+        self.logger.info(f"Launching LibreOffice with VCL plugin: {vcl_plugin}")
+        
+        approaches = list(self._launch_approaches(vcl_plugin))
+        
+        for i, (cmd, env) in enumerate(approaches):
             self.logger.info(f"Trying approach {i+1}: {' '.join(cmd[:2])}")
             
             try:
-                self.lo_process = subprocess.Popen(cmd, env=env)
+                # Nothing reads soffice's output: an inherited pipe could fill and
+                # stall its startup. Own session so a Ctrl-C to the runner leaves it
+                # for cleanup() to terminate
+                self.lo_process = subprocess.Popen(
+                    cmd,
+                    env=env,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
                 self.logger.info(f"LibreOffice launched with PID: {self.lo_process.pid}")
                 
-                # Give it time to start
-                time.sleep(3)
+                # Give it up to 3s to start; returns early on plug-added or
+                # if soffice exits
+                self.run_loop(3, self.lo_process)
+                if self.lo_process.poll() is not None:
+                    self.logger.info(f"LibreOffice exited with code {self.lo_process.returncode}")
                 
                 # Check if plug was added
                 if self.plug_added:
@@ -165,10 +174,10 @@ class EmbeddingTest:
                 if self.plug_added:
                     return True
                 
-                # Kill process for next attempt
+                # Kill process for next attempt; it is fully gone before the
+                # next approach launches
                 if self.lo_process:
-                    self.lo_process.terminate()
-                    time.sleep(1)
+                    reap(self.lo_process)
                     
             except Exception as e:
                 self.logger.error(f"Failed with approach {i+1}: {e}")
@@ -182,52 +191,124 @@ class EmbeddingTest:
         
         try:
             # Find LibreOffice window
+            for wid in self._find_windows_for_pid(self.lo_process.pid):
+                # Try to add window to socket
+                try:
+                    self.socket.add_id(wid)
+                    self.logger.info(f"Added window {wid} to socket")
+                    
+                    # plug-added is only dispatched while the loop runs
+                    if self.run_loop(1, self.lo_process):
+                        return True
+                except Exception as e:
+                    self.logger.debug(f"Failed to add window {wid}: {e}")
+                    continue
+        
+        except Exception as e:
+            self.logger.error(f"Error during reparenting: {e}")
+    
+    def _find_windows_for_pid(self, pid):
+        """
+        XIDs of the top-level windows whose _NET_WM_PID is pid
+        
+        Reads the property over the shared Xlib connection; only shells out to
+        xdotool when python-xlib is not installed. With Xlib, splash screens,
+        dialogs and other non-document windows are left out so they are never
+        offered to the socket
+        """
+        if not XLIB_AVAILABLE:
             result = subprocess.run(
-                ['xdotool', 'search', '--pid', str(self.lo_process.pid)],
+                ['xdotool', 'search', '--pid', str(pid)],
                 capture_output=True,
                 text=True
             )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                window_ids = result.stdout.strip().split('\n')
-                
-                for wid in window_ids:
-                    # Try to add window to socket
-                    try:
-                        self.socket.add_id(int(wid))
-                        self.logger.info(f"Added window {wid} to socket")
-                        time.sleep(1)
-                        
-                        if self.plug_added:
-                            return True
-                    except Exception as e:
-                        self.logger.debug(f"Failed to add window {wid}: {e}")
-                        continue
+            if result.returncode != 0:
+                return []
+            return [int(wid) for wid in result.stdout.split()]
         
-        except Exception as e:
-            self.logger.error(f"Error during reparenting: {e}")
+        return [window.id for window in find_windows_by_pid(get_display(), pid)]
+    
+    def _on_wait_timeout(self):
+        """Deadline for run_loop; the source is removed by returning False"""
+        self._timeout_id = None
+        self.loop.quit()
+        return False
+    
+    def _on_process_exit(self, fd, condition):
+        """The watched pidfd became readable: the child has exited"""
+        self._exit_watch_id = None
+        self.loop.quit()
+        return False
+    
+    def run_loop(self, timeout, process=None):
+        """
+        Dispatch GTK events until plug-added fires or timeout seconds pass
+        
+        If process is given, also stop as soon as it exits. A pidfd is
+        readable once the child exits and does not reap it, so Popen still
+        collects the exit status.
+        """
+        if self.plug_added:
+            return True
+        
+        pidfd = None
+        if process is not None:
+            if process.poll() is not None:
+                return self.plug_added
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except (AttributeError, OSError):
+                # Not Linux 5.3+ / Python 3.9+: fall back to the deadline alone
+                pidfd = None
+        
+        if pidfd is not None:
+            self._exit_watch_id = GLib.unix_fd_add_full(
+                GLib.PRIORITY_DEFAULT, pidfd, GLib.IOCondition.IN, self._on_process_exit
+            )
+        self._timeout_id = GLib.timeout_add(int(timeout * 1000), self._on_wait_timeout)
+        
+        try:
+            self.loop.run()
+        finally:
+            for source_id in (self._timeout_id, self._exit_watch_id):
+                if source_id is not None:
+                    GLib.source_remove(source_id)
+            self._timeout_id = None
+            self._exit_watch_id = None
+            if pidfd is not None:
+                os.close(pidfd)
+        
+        return self.plug_added
+    
+    def wait_until_drawn(self, timeout=3.0):
+        """Run the main loop until the window next paints, or timeout seconds pass"""
+        # Unlike time.sleep, this keeps GTK dispatching so the frame is drawn
+        handler_id = self.window.connect('draw', lambda widget, cr: self.loop.quit())
+        self.window.queue_draw()
+        self._timeout_id = GLib.timeout_add(int(timeout * 1000), self._on_wait_timeout)
+        try:
+            self.loop.run()
+        finally:
+            self.window.disconnect(handler_id)
+            if self._timeout_id is not None:
+                GLib.source_remove(self._timeout_id)
+                self._timeout_id = None
     
     def wait_and_verify(self, wait_time):
         """Wait and verify embedding"""
         self.logger.info(f"Waiting {wait_time}s for embedding...")
         
-        # Process GTK events while waiting
-        start_time = time.time()
-        while time.time() - start_time < wait_time:
-            while Gtk.events_pending():
-                Gtk.main_iteration()
-            time.sleep(0.1)
-            
-            if self.plug_added:
-                self.logger.info("✓ Embedding successful!")
-                return True
+        # Blocks in GLib's poll() and wakes as soon as the plug arrives
+        if self.run_loop(wait_time):
+            self.logger.info("✓ Embedding successful!")
+            return True
         
-        return self.plug_added
+        return False
     
     def cleanup(self):
         """Clean up resources"""
         if self.lo_process:
-            self.lo_process.terminate()
+            reap(self.lo_process)
             self.lo_process = None
         
         if self.window:
@@ -237,8 +318,7 @@ class EmbeddingTest:
                 pass
             
             # Process remaining events
-            while Gtk.events_pending():
-                Gtk.main_iteration()
+            _drain()
     
     def run(self, vcl_plugin, wait_time):
         """Run the test with specified parameters"""
@@ -260,8 +340,9 @@ class EmbeddingTest:
             if not self.wait_and_verify(wait_time):
                 return {'success': False, 'error': 'LibreOffice not embedded in socket'}
             
-            # Keep window open for screenshot
-            time.sleep(3)
+            # Keep window open until it has painted, for the screenshot
+            if self.config.get('screenshot_enabled'):
+                self.wait_until_drawn()
             
             return {
                 'success': True,
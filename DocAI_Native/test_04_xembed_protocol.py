@@ -6,13 +6,18 @@ Implements proper XEmbed protocol for embedding LibreOffice
 
 import os
 import time
+import atexit
 import subprocess
 import struct
 from pathlib import Path
 
 try:
-    from Xlib import X, display, Xatom
+    from Xlib import X
     from Xlib.protocol import event
+    from x11_container import (
+        LO_DOCUMENT_NAME_RE, LO_WM_CLASS, get_display, reap, scan_client_windows,
+        wait_for_event, wait_for_expose, wait_for_map_event
+    )
     XLIB_AVAILABLE = True
 except ImportError:
     XLIB_AVAILABLE = False
@@ -29,7 +34,57 @@ XEMBED_FOCUS_PREV = 7
 
 XEMBED_MAPPED = (1 << 0)
 
+# _XEMBED_INFO is two 32-bit CARDINALs (version, flags); '=' pins the size
+# and drops padding. The mapped value never changes, so pack it once
+_XEMBED_INFO_STRUCT = struct.Struct('=II')
+_XEMBED_INFO_MAPPED = _XEMBED_INFO_STRUCT.pack(0, XEMBED_MAPPED)  # version 0, mapped
+
 class EmbeddingTest:
+    # One soffice per VCL plugin (the plugin is fixed at process start), kept
+    # across runs; each run loads the document into it over UNO instead of
+    # cold-starting soffice
+    _UNO_PORT = 2083
+    _listener = None
+    _listener_plugin = None
+    
+    @classmethod
+    def _get_listener(cls, vcl_plugin):
+        """Return a running UNO listener for vcl_plugin, or None if UNO is unavailable"""
+        try:
+            from uno_bridge import import_uno_modules
+            from app.services.libreoffice_pool import LibreOfficeWorker
+            from config import CFG
+        except ImportError:
+            return None
+        if not import_uno_modules():
+            return None
+        
+        if cls._listener is not None:
+            if cls._listener_plugin == vcl_plugin and cls._listener.is_alive():
+                return cls._listener
+            cls._stop_listener()
+        
+        worker = LibreOfficeWorker(
+            cls._UNO_PORT,
+            CFG.CACHE_DIR / 'lo_profile_xembed_test',
+            env={**os.environ, 'SAL_USE_VCLPLUGIN': vcl_plugin}
+        )
+        if not worker.start():
+            return None
+        
+        if cls._listener_plugin is None:
+            atexit.register(cls._stop_listener)
+        cls._listener = worker
+        cls._listener_plugin = vcl_plugin
+        return worker
+    
+    @classmethod
+    def _stop_listener(cls):
+        """Terminate the persistent soffice"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+    
     def __init__(self, config, test_dir, logger):
         self.config = config
         self.test_dir = test_dir
@@ -37,9 +92,13 @@ class EmbeddingTest:
         self.display = None
         self.container_window = None
         self.lo_process = None
+        self.loaded_doc = None
         self.lo_window = None
         self.xembed_atom = None
         self.xembed_info_atom = None
+        # The launch command is fixed for the test, so build it once
+        self._test_file = str(Path(__file__).parent / config['test_document'])
+        self._base_cmd = ('soffice', '--nologo', '--norestore', '--nodefault', '--view', self._test_file)
         
     def create_container_window(self):
         """Create a container window with XEmbed support"""
@@ -50,14 +109,19 @@ class EmbeddingTest:
         self.logger.info("Creating XEmbed container window...")
         
         try:
-            # Open X display
-            self.display = display.Display()
+            # Reuse the process-wide X display
+            self.display = get_display()
             screen = self.display.screen()
             root = screen.root
             
-            # Get atoms
-            self.xembed_atom = self.display.intern_atom('_XEMBED')
-            self.xembed_info_atom = self.display.intern_atom('_XEMBED_INFO')
+            # get_atom interns once per display and caches the result
+            self.xembed_atom = self.display.get_atom('_XEMBED')
+            self.xembed_info_atom = self.display.get_atom('_XEMBED_INFO')
+            
+            # Get MapNotify for new top-level windows, and PropertyNotify for
+            # _NET_CLIENT_LIST, so the LibreOffice window search can wake up
+            # as soon as it appears
+            root.change_attributes(event_mask=X.SubstructureNotifyMask | X.PropertyChangeMask)
             
             # Create window
             self.container_window = root.create_window(
@@ -69,9 +133,10 @@ class EmbeddingTest:
                 X.InputOutput,
                 X.CopyFromParent,
                 background_pixel=screen.white_pixel,
+                # No SubstructureRedirectMask: nothing here answers
+                # MapRequest/ConfigureRequest for the embedded child
                 event_mask=(X.ExposureMask | X.KeyPressMask | 
-                           X.StructureNotifyMask | X.SubstructureNotifyMask |
-                           X.SubstructureRedirectMask)
+                           X.StructureNotifyMask | X.SubstructureNotifyMask)
             )
             
             # Set window properties
@@ -79,12 +144,11 @@ class EmbeddingTest:
             self.container_window.set_wm_class("xembed_container", "XEmbedContainer")
             
             # Set _XEMBED_INFO property to indicate we support XEmbed
-            xembed_info = struct.pack('II', 0, XEMBED_MAPPED)  # version 0, mapped
             self.container_window.change_property(
                 self.xembed_info_atom,
                 self.xembed_info_atom,
                 32,
-                xembed_info
+                _XEMBED_INFO_MAPPED
             )
             
             # Map (show) the window
@@ -102,7 +166,15 @@ class EmbeddingTest:
         """Launch LibreOffice with specified VCL plugin"""
         self.logger.info(f"Launching LibreOffice with VCL plugin: {vcl_plugin}")
         
-        test_file = Path(__file__).parent / self.config['test_document']
+        # Load into the persistent instance when UNO is available
+        listener = self._get_listener(vcl_plugin)
+        if listener is not None:
+            try:
+                self.loaded_doc = listener.load_document(self._test_file)
+                self.logger.info(f"Document loaded into running LibreOffice (PID: {listener.process.pid})")
+                return True
+            except Exception as e:
+                self.logger.warning(f"UNO load failed, starting soffice: {e}")
         
         env = os.environ.copy()
         env['SAL_USE_VCLPLUGIN'] = vcl_plugin
@@ -110,17 +182,18 @@ class EmbeddingTest:
         # Set container window ID in environment (some apps check this)
         env['XEMBED_CONTAINER_ID'] = str(self.container_window.id)
         
-        cmd = [
-            'soffice',
-            '--nologo',
-            '--norestore',
-            '--nodefault',
-            '--view',
-            str(test_file)
-        ]
-        
         try:
-            self.lo_process = subprocess.Popen(cmd, env=env)
+            # Nothing reads soffice's output: an inherited pipe could fill and
+            # stall its startup. Own session so a Ctrl-C to the runner leaves it
+            # for cleanup() to terminate
+            self.lo_process = subprocess.Popen(
+                self._base_cmd,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
             self.logger.info(f"LibreOffice launched with PID: {self.lo_process.pid}")
             return True
         except Exception as e:
@@ -132,44 +205,19 @@ class EmbeddingTest:
         if not self.display:
             return False
         
-        self.logger.info(f"Waiting {wait_time}s for LibreOffice window...")
-        time.sleep(wait_time)
+        self.logger.info(f"Waiting up to {wait_time}s for LibreOffice window...")
+        deadline = time.monotonic() + wait_time
         
         try:
-            # Get root window
-            root = self.display.screen().root
-            
-            # Query window tree
-            tree = root.query_tree()
-            
-            for window in tree.children:
-                try:
-                    # Get window properties
-                    wm_class = window.get_wm_class()
-                    wm_name = window.get_wm_name()
-                    
-                    if wm_class and 'libreoffice' in str(wm_class).lower():
-                        self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
-                        
-                        # Skip splash screens
-                        if wm_name and ('test_embed' in wm_name or 
-                                      ('LibreOffice' in wm_name and 'Start' not in wm_name)):
-                            
-                            # Check if window supports XEmbed
-                            xembed_info = self.get_xembed_info(window)
-                            if xembed_info:
-                                self.logger.info(f"Window supports XEmbed: {xembed_info}")
-                            else:
-                                self.logger.info("Window doesn't have _XEMBED_INFO, adding it")
-                                self.set_xembed_info(window)
-                            
-                            self.lo_window = window
-                            self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
-                            return True
-                            
-                except Exception as e:
-                    self.logger.debug(f"Error checking window: {e}")
-                    continue
+            # Rescan only when a window is mapped, instead of sleeping the
+            # whole wait_time and scanning once
+            while True:
+                if self._select_libreoffice_window():
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not wait_for_map_event(self.display, remaining):
+                    break
             
             self.logger.warning("No suitable LibreOffice window found")
             return False
@@ -178,6 +226,38 @@ class EmbeddingTest:
             self.logger.error(f"Error finding LibreOffice window: {e}")
             return False
     
+    def _select_libreoffice_window(self):
+        """Scan top-level windows for the LibreOffice document window"""
+        # Attributes, WM_CLASS and WM_NAME for every window in one round-trip
+        for window, attrs, wm_class, wm_name in scan_client_windows(self.display, attributes=True):
+            # Only viewable InputOutput windows can be the document window
+            if attrs.map_state != X.IsViewable or attrs.win_class == X.InputOnly:
+                continue
+            if LO_WM_CLASS not in wm_class.lower():
+                continue
+            
+            self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
+            
+            # Skip splash screens
+            if wm_name and LO_DOCUMENT_NAME_RE.search(wm_name):
+                try:
+                    # Check if window supports XEmbed
+                    xembed_info = self.get_xembed_info(window)
+                    if xembed_info:
+                        self.logger.info(f"Window supports XEmbed: {xembed_info}")
+                    else:
+                        self.logger.info("Window doesn't have _XEMBED_INFO, adding it")
+                        self.set_xembed_info(window)
+                except Exception as e:
+                    self.logger.debug(f"Error checking window: {e}")
+                    continue
+                
+                self.lo_window = window
+                self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
+                return True
+        
+        return False
+    
     def get_xembed_info(self, window):
         """Get _XEMBED_INFO property from window"""
         try:
@@ -186,7 +266,7 @@ class EmbeddingTest:
                 # Unpack version and flags
                 data = prop.value
                 if len(data) >= 8:
-                    version, flags = struct.unpack('II', data[:8])
+                    version, flags = _XEMBED_INFO_STRUCT.unpack_from(data)
                     return {'version': version, 'flags': flags}
         except:
             pass
@@ -195,12 +275,11 @@ class EmbeddingTest:
     def set_xembed_info(self, window):
         """Set _XEMBED_INFO property on window"""
         try:
-            xembed_info = struct.pack('II', 0, XEMBED_MAPPED)  # version 0, mapped
             window.change_property(
                 self.xembed_info_atom,
                 self.xembed_info_atom,
                 32,
-                xembed_info
+                _XEMBED_INFO_MAPPED
             )
             self.display.sync()
         except Exception as e:
@@ -215,6 +294,10 @@ class EmbeddingTest:
         try:
             self.logger.info(f"Embedding 0x{self.lo_window.id:x} using XEmbed protocol")
             
+            # Hear the child update _XEMBED_INFO and repaint; its configure
+            # arrives through the container's SubstructureNotifyMask
+            self.lo_window.change_attributes(event_mask=X.PropertyChangeMask | X.ExposureMask)
+            
             # Step 1: Reparent the window
             self.lo_window.reparent(self.container_window, 0, 0)
             
@@ -250,12 +333,16 @@ class EmbeddingTest:
                 0, 0, 0
             )
             
+            # Single round-trip for the whole sequence; the server handles
+            # the buffered requests in order
             self.display.sync()
             
             self.logger.info("XEmbed protocol completed")
             
-            # Give it a moment to settle
-            time.sleep(2)
+            # Settled once the child reacts to _XEMBED_INFO or takes its new
+            # geometry, rather than after a fixed 2s
+            if not wait_for_event(self.display, self._is_settle_event, 2.0):
+                self.logger.warning("Embedded window did not settle within 2s, verifying anyway")
             
             # Verify embedding
             return self.verify_embedding()
@@ -264,8 +351,21 @@ class EmbeddingTest:
             self.logger.error(f"Error during XEmbed embedding: {e}")
             return False
     
-    def send_xembed_message(self, window, message, detail, data1, data2):
-        """Send XEmbed message to window"""
+    def _is_settle_event(self, ev):
+        """PropertyNotify on the child's _XEMBED_INFO or its ConfigureNotify"""
+        if ev.type == X.PropertyNotify:
+            return ev.window.id == self.lo_window.id and ev.atom == self.xembed_info_atom
+        if ev.type == X.ConfigureNotify:
+            return ev.window.id == self.lo_window.id
+        return False
+    
+    def send_xembed_message(self, window, message, detail, data1, data2, sync=False):
+        """
+        Send XEmbed message to window
+        
+        The event is only queued unless sync is set; callers batching several
+        requests sync once at the end
+        """
         try:
             # Create ClientMessage event
             ev = event.ClientMessage(
@@ -276,7 +376,8 @@ class EmbeddingTest:
             
             # Send event
             window.send_event(ev, event_mask=X.NoEventMask)
-            self.display.sync()
+            if sync:
+                self.display.sync()
             
             self.logger.debug(f"Sent XEmbed message: {message}")
             
@@ -311,20 +412,25 @@ class EmbeddingTest:
     def cleanup(self):
         """Clean up resources"""
         if self.lo_process:
-            self.lo_process.terminate()
+            reap(self.lo_process)
             self.lo_process = None
         
+        # Close the document (and its window) before the container is
+        # destroyed; the persistent soffice stays up for the next run
+        if self.loaded_doc:
+            self.loaded_doc.close()
+            self.loaded_doc = None
+        
         if self.container_window:
             try:
                 self.container_window.destroy()
+                # The display stays open for the next run; push the destroy out now
+                self.display.flush()
             except:
                 pass
+            self.container_window = None
         
-        if self.display:
-            try:
-                self.display.close()
-            except:
-                pass
+        self.lo_window = None
     
     def run(self, vcl_plugin, wait_time):
         """Run the test with specified parameters"""
@@ -350,8 +456,9 @@ class EmbeddingTest:
             if not self.embed_window():
                 return {'success': False, 'error': 'Failed to embed window with XEmbed'}
             
-            # Keep window open for screenshot
-            time.sleep(3)
+            # Keep window open until it has painted, for the screenshot
+            if self.config.get('screenshot_enabled'):
+                wait_for_expose(self.display, (self.container_window, self.lo_window), 3.0)
             
             return {
                 'success': True,
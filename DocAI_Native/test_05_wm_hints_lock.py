@@ -7,20 +7,78 @@ Uses window manager hints to lock LibreOffice window in container
 import os
 import time
 import subprocess
+import struct
 from pathlib import Path
 
 try:
-    from Xlib import X, display, Xatom
-    from Xlib.protocol import rq
+    from Xlib import X, Xatom
+    from Xlib.protocol import event, request
+    from x11_container import (
+        LO_DOCUMENT_NAME_RE, LO_WM_CLASS, get_display, reap, scan_client_windows,
+        wait_for_event, wait_for_expose, wait_for_map_event
+    )
     XLIB_AVAILABLE = True
 except ImportError:
     XLIB_AVAILABLE = False
 
+# Resolved once so the document path is absolute whatever the cwd
+_MODULE_DIR = Path(__file__).resolve().parent
+
 # Window manager hint constants
 _NET_WM_STATE_REMOVE = 0
 _NET_WM_STATE_ADD = 1
 _NET_WM_STATE_TOGGLE = 2
 
+# _MOTIF_WM_HINTS is five 32-bit fields: flags, functions, decorations,
+# input_mode, status. python-xlib sends bytes as-is, so pack it once in
+# native byte order; '=' drops padding
+_MOTIF_HINTS_NO_DECORATIONS = struct.pack(
+    '=5I',
+    2,      # flags: MWM_HINTS_DECORATIONS
+    0,      # functions
+    0,      # decorations: 0 = no decorations
+    0,      # input_mode
+    0       # status
+)
+
+# Atoms interned for the container and the lock sequence
+_WM_ATOM_NAMES = (
+    '_NET_WM_STATE',
+    '_NET_WM_STATE_ABOVE',
+    '_NET_WM_STATE_STICKY',
+    '_NET_WM_STATE_SKIP_TASKBAR',
+    '_NET_WM_STATE_SKIP_PAGER',
+    '_NET_WM_WINDOW_TYPE',
+    '_NET_WM_WINDOW_TYPE_DOCK',
+    '_NET_WM_WINDOW_TYPE_NORMAL',
+    '_MOTIF_WM_HINTS',
+    'WM_TRANSIENT_FOR',
+)
+
+# Atom ids live as long as the X server, so every EmbeddingTest in the
+# process shares them; keyed by display name, which outlives any connection
+_WM_ATOMS_CACHE = {}
+
+
+def _intern_wm_atoms(xdisplay):
+    """Intern the WM atoms once per display, sending every request before reading any reply"""
+    key = xdisplay.get_display_name()
+    atoms = _WM_ATOMS_CACHE.get(key)
+    if atoms is None:
+        pending = [
+            (name, request.InternAtom(display=xdisplay.display, defer=True,
+                                      name=name, only_if_exists=False))
+            for name in _WM_ATOM_NAMES
+        ]
+        # Replies arrive in request order, so the batch costs one round-trip
+        atoms = {}
+        for name, req in pending:
+            req.reply()
+            atoms[name] = req.atom
+        _WM_ATOMS_CACHE[key] = atoms
+    return dict(atoms)
+
+
 class EmbeddingTest:
     def __init__(self, config, test_dir, logger):
         self.config = config
@@ -31,6 +89,9 @@ class EmbeddingTest:
         self.lo_process = None
         self.lo_window = None
         self.wm_atoms = {}
+        # The launch command is fixed for the test, so build it once
+        self._test_file = str(_MODULE_DIR / config['test_document'])
+        self._base_cmd = ('soffice', '--nologo', '--norestore', '--nodefault', '--view', self._test_file)
         
     def create_container_window(self):
         """Create a container window with proper WM hints"""
@@ -41,24 +102,18 @@ class EmbeddingTest:
         self.logger.info("Creating container window with WM hints...")
         
         try:
-            # Open X display
-            self.display = display.Display()
+            # Reuse the process-wide X display
+            self.display = get_display()
             screen = self.display.screen()
             root = screen.root
             
+            # Get MapNotify for new top-level windows, and PropertyNotify for
+            # _NET_CLIENT_LIST, so the LibreOffice window search can wake up
+            # as soon as it appears
+            root.change_attributes(event_mask=X.SubstructureNotifyMask | X.PropertyChangeMask)
+            
             # Get important atoms
-            self.wm_atoms = {
-                '_NET_WM_STATE': self.display.intern_atom('_NET_WM_STATE'),
-                '_NET_WM_STATE_ABOVE': self.display.intern_atom('_NET_WM_STATE_ABOVE'),
-                '_NET_WM_STATE_STICKY': self.display.intern_atom('_NET_WM_STATE_STICKY'),
-                '_NET_WM_STATE_SKIP_TASKBAR': self.display.intern_atom('_NET_WM_STATE_SKIP_TASKBAR'),
-                '_NET_WM_STATE_SKIP_PAGER': self.display.intern_atom('_NET_WM_STATE_SKIP_PAGER'),
-                '_NET_WM_WINDOW_TYPE': self.display.intern_atom('_NET_WM_WINDOW_TYPE'),
-                '_NET_WM_WINDOW_TYPE_DOCK': self.display.intern_atom('_NET_WM_WINDOW_TYPE_DOCK'),
-                '_NET_WM_WINDOW_TYPE_NORMAL': self.display.intern_atom('_NET_WM_WINDOW_TYPE_NORMAL'),
-                '_MOTIF_WM_HINTS': self.display.intern_atom('_MOTIF_WM_HINTS'),
-                'WM_TRANSIENT_FOR': self.display.intern_atom('WM_TRANSIENT_FOR')
-            }
+            self.wm_atoms = _intern_wm_atoms(self.display)
             
             # Create window
             self.container_window = root.create_window(
@@ -102,22 +157,10 @@ class EmbeddingTest:
         """Launch LibreOffice with specified VCL plugin"""
         self.logger.info(f"Launching LibreOffice with VCL plugin: {vcl_plugin}")
         
-        test_file = Path(__file__).parent / self.config['test_document']
-        
-        env = os.environ.copy()
-        env['SAL_USE_VCLPLUGIN'] = vcl_plugin
-        
-        cmd = [
-            'soffice',
-            '--nologo',
-            '--norestore',
-            '--nodefault',
-            '--view',
-            str(test_file)
-        ]
+        env = {**os.environ, 'SAL_USE_VCLPLUGIN': vcl_plugin}
         
         try:
-            self.lo_process = subprocess.Popen(cmd, env=env)
+            self.lo_process = subprocess.Popen(self._base_cmd, env=env, start_new_session=True)
             self.logger.info(f"LibreOffice launched with PID: {self.lo_process.pid}")
             return True
         except Exception as e:
@@ -125,39 +168,21 @@ class EmbeddingTest:
             return False
     
     def find_libreoffice_window(self, wait_time):
-        """Find LibreOffice window"""
+        """Find LibreOffice window, waking on map events instead of sleeping"""
         if not self.display:
             return False
         
-        self.logger.info(f"Waiting {wait_time}s for LibreOffice window...")
-        time.sleep(wait_time)
+        self.logger.info(f"Waiting up to {wait_time}s for LibreOffice window...")
+        deadline = time.monotonic() + wait_time
         
         try:
-            # Get root window
-            root = self.display.screen().root
-            
-            # Query window tree
-            tree = root.query_tree()
-            
-            for window in tree.children:
-                try:
-                    # Get window properties
-                    wm_class = window.get_wm_class()
-                    wm_name = window.get_wm_name()
-                    
-                    if wm_class and 'libreoffice' in str(wm_class).lower():
-                        self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
-                        
-                        # Skip splash screens
-                        if wm_name and ('test_embed' in wm_name or 
-                                      ('LibreOffice' in wm_name and 'Start' not in wm_name)):
-                            self.lo_window = window
-                            self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
-                            return True
-                            
-                except Exception as e:
-                    self.logger.debug(f"Error checking window: {e}")
-                    continue
+            while True:
+                if self._select_libreoffice_window():
+                    return True
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not wait_for_map_event(self.display, remaining):
+                    break
             
             self.logger.warning("No suitable LibreOffice window found")
             return False
@@ -166,6 +191,23 @@ class EmbeddingTest:
             self.logger.error(f"Error finding LibreOffice window: {e}")
             return False
     
+    def _select_libreoffice_window(self):
+        """Scan top-level windows for the LibreOffice document window"""
+        # Managed windows only, WM_CLASS and WM_NAME for all in one round-trip
+        for window, _, wm_class, wm_name in scan_client_windows(self.display):
+            if LO_WM_CLASS not in wm_class.lower():
+                continue
+            
+            self.logger.info(f"Found window: {wm_name} (0x{window.id:x})")
+            
+            # Skip splash screens
+            if wm_name and LO_DOCUMENT_NAME_RE.search(wm_name):
+                self.lo_window = window
+                self.logger.info(f"Selected LibreOffice window: 0x{window.id:x}")
+                return True
+        
+        return False
+    
     def lock_window_with_hints(self):
         """Use window manager hints to lock LibreOffice window in container"""
         if not self.lo_window or not self.container_window:
@@ -175,73 +217,79 @@ class EmbeddingTest:
         try:
             self.logger.info(f"Locking 0x{self.lo_window.id:x} using WM hints")
             
-            # Step 1: Remove window decorations using Motif hints
-            # _MOTIF_WM_HINTS structure: flags, functions, decorations, input_mode, status
-            motif_hints = [
-                2,      # flags: MWM_HINTS_DECORATIONS
-                0,      # functions
-                0,      # decorations: 0 = no decorations
-                0,      # input_mode
-                0       # status
-            ]
+            # None of the steps below needs a reply: python-xlib only queues
+            # them, and the sync at the end writes the whole batch at once
             
-            self.lo_window.change_property(
-                self.wm_atoms['_MOTIF_WM_HINTS'],
-                self.wm_atoms['_MOTIF_WM_HINTS'],
-                32,
-                motif_hints,
-                format=32
-            )
-            
-            # Step 2: Set transient for hint to make it a child of container
-            self.lo_window.change_property(
-                self.wm_atoms['WM_TRANSIENT_FOR'],
-                Xatom.WINDOW,
-                32,
-                [self.container_window.id]
-            )
-            
-            # Step 3: Reparent the window
-            self.lo_window.reparent(self.container_window, 0, 0)
-            
-            # Step 4: Configure window size
-            self.lo_window.configure(
-                width=self.config['container_size']['width'],
-                height=self.config['container_size']['height']
-            )
-            
-            # Step 5: Set window state hints to prevent movement
-            # Remove ability to move/resize
-            self.send_client_message(
-                self.lo_window,
-                self.wm_atoms['_NET_WM_STATE'],
-                [_NET_WM_STATE_ADD, 
-                 self.wm_atoms['_NET_WM_STATE_STICKY'],
-                 0, 1, 0]
-            )
-            
-            # Step 6: Set override redirect to bypass WM completely
-            self.lo_window.change_attributes(override_redirect=1)
-            
-            # Step 7: Grab pointer to prevent dragging
-            self.container_window.grab_button(
-                X.AnyButton,
-                X.NoModifier,
-                True,
-                X.ButtonPressMask | X.ButtonReleaseMask,
-                X.GrabModeSync,
-                X.GrabModeAsync,
-                X.NONE,
-                X.NONE
-            )
-            
-            # Sync all changes
-            self.display.sync()
+            # Grab the server so the window manager cannot act on a
+            # half-applied lock; it sees the whole sequence land at once
+            self.display.grab_server()
+            try:
+                # Hear the ReparentNotify and ConfigureNotify once the lock lands,
+                # and Expose for the screenshot wait
+                self.lo_window.change_attributes(event_mask=X.StructureNotifyMask | X.ExposureMask)
+                
+                # Step 1: Remove window decorations using Motif hints
+                self.lo_window.change_property(
+                    self.wm_atoms['_MOTIF_WM_HINTS'],
+                    self.wm_atoms['_MOTIF_WM_HINTS'],
+                    32,
+                    _MOTIF_HINTS_NO_DECORATIONS
+                )
+                
+                # Step 2: Set transient for hint to make it a child of container
+                self.lo_window.change_property(
+                    self.wm_atoms['WM_TRANSIENT_FOR'],
+                    Xatom.WINDOW,
+                    32,
+                    [self.container_window.id]
+                )
+                
+                # Step 3: Reparent the window
+                self.lo_window.reparent(self.container_window, 0, 0)
+                
+                # Step 4: Configure window size
+                self.lo_window.configure(
+                    width=self.config['container_size']['width'],
+                    height=self.config['container_size']['height']
+                )
+                
+                # Step 5: Set window state hints to prevent movement
+                # Remove ability to move/resize
+                self.send_client_message(
+                    self.lo_window,
+                    self.wm_atoms['_NET_WM_STATE'],
+                    [_NET_WM_STATE_ADD, 
+                     self.wm_atoms['_NET_WM_STATE_STICKY'],
+                     0, 1, 0],
+                    flush=False
+                )
+                
+                # Step 6: Set override redirect to bypass WM completely
+                self.lo_window.change_attributes(override_redirect=1)
+                
+                # Step 7: Grab pointer to prevent dragging
+                self.container_window.grab_button(
+                    X.AnyButton,
+                    X.NoModifier,
+                    True,
+                    X.ButtonPressMask | X.ButtonReleaseMask,
+                    X.GrabModeSync,
+                    X.GrabModeAsync,
+                    X.NONE,
+                    X.NONE
+                )
+            finally:
+                # Release even if queuing failed; the sync sends the batch
+                # and waits for the server to process it
+                self.display.ungrab_server()
+                self.display.sync()
             
             self.logger.info("Window locked with WM hints")
             
-            # Give it a moment to settle
-            time.sleep(2)
+            # Wait for the server to report the new parent and geometry
+            # instead of sleeping, so verification never sees a half-applied lock
+            if not self._wait_for_lock(2.0):
+                self.logger.warning("Lock not confirmed by events within 2s, verifying anyway")
             
             # Verify locking
             return self.verify_locking()
@@ -250,17 +298,49 @@ class EmbeddingTest:
             self.logger.error(f"Error during window locking: {e}")
             return False
     
-    def send_client_message(self, window, message_type, data):
-        """Send a client message to the window manager"""
-        event = rq.ClientMessage(
+    def _wait_for_lock(self, timeout):
+        """
+        Block until the lock has landed, or the timeout expires
+        
+        The lock has landed once the window has been reparented into the
+        container and configured to fill it at (0, 0)
+        """
+        lo_id = self.lo_window.id
+        container_id = self.container_window.id
+        geometry = (0, 0, self.config['container_size']['width'], self.config['container_size']['height'])
+        seen = set()
+        
+        def landed(ev):
+            if ev.type == X.ReparentNotify and ev.window.id == lo_id:
+                if ev.parent.id == container_id:
+                    seen.add(X.ReparentNotify)
+            elif ev.type == X.ConfigureNotify and ev.window.id == lo_id:
+                if (ev.x, ev.y, ev.width, ev.height) == geometry:
+                    seen.add(X.ConfigureNotify)
+            return len(seen) == 2
+        
+        return wait_for_event(self.display, landed, timeout)
+    
+    def send_client_message(self, window, message_type, data, sync=False, flush=True):
+        """
+        Send a client message to the window manager
+        
+        The event is flushed to the server without waiting for it unless sync
+        is set; callers batching several requests pass flush=False to leave it
+        queued and sync once at the end
+        """
+        ev = event.ClientMessage(
             window=window,
             client_type=message_type,
             data=(32, data)
         )
         
         root = self.display.screen().root
-        root.send_event(event, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
-        self.display.sync()
+        root.send_event(ev, event_mask=X.SubstructureRedirectMask | X.SubstructureNotifyMask)
+        if sync:
+            self.display.sync()
+        elif flush:
+            self.display.flush()
     
     def verify_locking(self):
         """Verify that window is locked in container"""
@@ -268,10 +348,16 @@ class EmbeddingTest:
             return False
         
         try:
-            # Query window attributes
-            geom = self.lo_window.get_geometry()
-            parent = self.lo_window.query_tree().parent
-            attrs = self.lo_window.get_attributes()
+            # Issue all three queries before reading any reply: one round-trip
+            xdisplay = self.display.display
+            wid = self.lo_window.id
+            geom = request.GetGeometry(display=xdisplay, defer=True, drawable=wid)
+            tree = request.QueryTree(display=xdisplay, defer=True, window=wid)
+            attrs = request.GetWindowAttributes(display=xdisplay, defer=True, window=wid)
+            geom.reply()
+            tree.reply()
+            attrs.reply()
+            parent = tree.parent
             
             self.logger.info(f"Window geometry: {geom.width}x{geom.height} at ({geom.x},{geom.y})")
             self.logger.info(f"Parent window ID: 0x{parent.id:x}")
@@ -315,20 +401,19 @@ class EmbeddingTest:
     def cleanup(self):
         """Clean up resources"""
         if self.lo_process:
-            self.lo_process.terminate()
+            reap(self.lo_process, timeout=5.0)
             self.lo_process = None
         
         if self.container_window:
             try:
                 self.container_window.destroy()
+                # The display stays open for the next run; push the destroy out now
+                self.display.flush()
             except:
                 pass
+            self.container_window = None
         
-        if self.display:
-            try:
-                self.display.close()
-            except:
-                pass
+        self.lo_window = None
     
     def run(self, vcl_plugin, wait_time):
         """Run the test with specified parameters"""
@@ -354,8 +439,9 @@ class EmbeddingTest:
             if not self.lock_window_with_hints():
                 return {'success': False, 'error': 'Failed to lock window with WM hints'}
             
-            # Keep window open for screenshot
-            time.sleep(3)
+            # Keep window open until it has painted, for the screenshot
+            if self.config.get('screenshot_enabled'):
+                wait_for_expose(self.display, (self.container_window, self.lo_window), 3.0)
             
             return {
                 'success': True,
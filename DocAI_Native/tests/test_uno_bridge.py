@@ -314,6 +314,19 @@ class TestUNOSocketBridge(unittest.TestCase):
         bridge = UNOSocketBridge()
         self.assertEqual(bridge.port, 12345)
     
+    @patch('uno_bridge.socket.socket')
+    def test_find_free_port_sets_reuseaddr(self, mock_socket_class):
+        """Test allocated ports can be re-bound after TIME_WAIT"""
+        import socket
+        mock_socket = Mock()
+        mock_socket.getsockname.return_value = ('', 12345)
+        mock_socket_class.return_value.__enter__.return_value = mock_socket
+        
+        UNOSocketBridge()
+        mock_socket.setsockopt.assert_called_with(
+            socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
+        )
+    
     @patch('uno_bridge.subprocess.Popen')
     @patch.object(UNOSocketBridge, '_test_uno_connection')
     @patch.object(UNOSocketBridge, '_check_libreoffice_path')
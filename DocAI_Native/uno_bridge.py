@@ -431,6 +431,8 @@ class UNOSocketBridge:
     def _find_free_port(self):
         """Find free port for UNO"""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # Ports left in TIME_WAIT by a failed attempt stay usable
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind(('', 0))
             self.port = s.getsockname()[1]
         logger.debug(f"UNO port allocated: {self.port}")
@@ -438,6 +440,8 @@ class UNOSocketBridge:
     def _is_port_in_use(self, port):
         """Check if port is in use"""
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            # A TIME_WAIT leftover does not count as in use
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             try:
                 s.bind(('localhost', port))
                 return False
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+X11 helpers shared by the embedding tests
+One process-wide Xlib connection, the top-level container window LibreOffice
+gets reparented into (created without starting a GUI toolkit), window
+lookups, event waits, and reaping the soffice child
+"""
+
+import os
+import re
+import atexit
+import select
+import subprocess
+import time
+
+try:
+    from Xlib import X, Xatom, display as xdisplay
+    from Xlib.protocol import request
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# Substring of a LibreOffice window's lowercased WM_CLASS property bytes
+LO_WM_CLASS = b'libreoffice'
+
+# Document window title: the test document, or any LibreOffice window
+# except the Start Center / splash
+LO_DOCUMENT_NAME_RE = re.compile(r'test_embed|^(?!.*Start).*LibreOffice')
+
+# Shared by every test module and run in the process; see get_display()
+_display = None
+
+
+def get_display():
+    """Open the shared X display on first use; it is closed at interpreter exit"""
+    global _display
+    if _display is None:
+        _display = xdisplay.Display()
+        atexit.register(_close_display)
+    return _display
+
+
+def _close_display():
+    """Close the shared X display"""
+    global _display
+    if _display is not None:
+        try:
+            _display.close()
+        except Exception:
+            pass
+        _display = None
+
+
+def create_container_window(display, width, height, title):
+    """
+    Create and map a top-level container window
+
+    Args:
+        display: Open Xlib display
+        width: Container width in pixels
+        height: Container height in pixels
+        title: WM_NAME shown by the window manager
+
+    Returns:
+        The mapped Xlib window; its XID is window.id
+    """
+    screen = display.screen()
+
+    window = screen.root.create_window(
+        50, 50,  # x, y
+        width,
+        height,
+        2,  # border width
+        screen.root_depth,
+        X.InputOutput,
+        X.CopyFromParent,
+        background_pixel=screen.white_pixel,
+        event_mask=X.ExposureMask | X.KeyPressMask | X.StructureNotifyMask
+    )
+
+    # Set window properties
+    window.set_wm_name(title)
+    window.set_wm_class("libreoffice_container", "LibreOfficeContainer")
+
+    # Map (show) the window
+    window.map()
+    display.sync()
+
+    return window
+
+
+def client_windows(display):
+    """
+    List the top-level windows to search for an application window
+
+    Reads the window manager's EWMH _NET_CLIENT_LIST, which holds only
+    managed client windows; falls back to every child of the root when no
+    EWMH window manager is running
+
+    Args:
+        display: Open Xlib display
+
+    Returns:
+        List of Xlib windows
+    """
+    root = display.screen().root
+    clients = root.get_full_property(display.get_atom('_NET_CLIENT_LIST'), X.AnyPropertyType)
+    if clients is None:
+        return root.query_tree().children
+    return [display.create_resource_object('window', wid) for wid in clients.value]
+
+
+def find_windows_by_pid(display, pid):
+    """
+    Find the LibreOffice document windows owned by a process
+
+    Matches _NET_WM_PID against pid and skips splash screens, dialogs and
+    other windows whose _NET_WM_WINDOW_TYPE is not normal, or whose WM_CLASS
+    is not LibreOffice's
+
+    Args:
+        display: Open Xlib display
+        pid: Process id of the soffice child
+
+    Returns:
+        List of Xlib windows
+    """
+    # get_atom interns once and caches the atom on the display
+    pid_atom = display.get_atom('_NET_WM_PID')
+    type_atom = display.get_atom('_NET_WM_WINDOW_TYPE')
+    normal_atom = display.get_atom('_NET_WM_WINDOW_TYPE_NORMAL')
+
+    windows = []
+    for window in client_windows(display):
+        try:
+            prop = window.get_full_property(pid_atom, Xatom.CARDINAL)
+            if not prop or prop.value[0] != pid:
+                continue
+
+            # EWMH: a managed window without a type is a normal window
+            window_type = window.get_full_property(type_atom, Xatom.ATOM)
+            if window_type and normal_atom not in window_type.value:
+                continue
+
+            wm_class = window.get_wm_class()
+            if not wm_class or 'libreoffice' not in str(wm_class).lower():
+                continue
+        except Exception:
+            # Window disappeared between listing and query
+            continue
+        windows.append(window)
+    return windows
+
+
+def scan_client_windows(display, attributes=False):
+    """
+    Read WM_CLASS and WM_NAME of every client window in one round-trip
+    
+    The requests for all windows are issued before any reply is read.
+    Windows that vanish during the scan are skipped
+    
+    Args:
+        display: Open Xlib display
+        attributes: Also fetch each window's GetWindowAttributes reply
+    
+    Yields:
+        (window, attrs, wm_class, wm_name): attrs is None unless attributes
+        is set, wm_class the raw 'instance\\0class\\0' bytes (b'' if unset),
+        wm_name the Latin-1 decoded title or None
+    """
+    xdisp = display.display
+    pending = [
+        (
+            window,
+            request.GetWindowAttributes(display=xdisp, defer=True, window=window.id)
+            if attributes else None,
+            request.GetProperty(display=xdisp, defer=True, delete=False,
+                                window=window.id, property=Xatom.WM_CLASS,
+                                type=Xatom.STRING, long_offset=0, long_length=64),
+            request.GetProperty(display=xdisp, defer=True, delete=False,
+                                window=window.id, property=Xatom.WM_NAME,
+                                type=Xatom.STRING, long_offset=0, long_length=256)
+        )
+        for window in client_windows(display)
+    ]
+    
+    for window, attrs, wm_class, wm_name in pending:
+        try:
+            # Replies arrive in request order; errors such as BadWindow
+            # for a window that vanished are raised here
+            if attrs is not None:
+                attrs.reply()
+            wm_class.reply()
+            wm_name.reply()
+        except Exception:
+            continue
+        
+        yield (
+            window,
+            attrs,
+            bytes(wm_class.value[1]) if wm_class.property_type else b'',
+            # WM_NAME is a Latin-1 STRING, as get_wm_name() decodes it
+            bytes(wm_name.value[1]).decode('latin-1') if wm_name.property_type else None
+        )
+
+
+def wait_for_event(display, predicate, timeout):
+    """
+    Consume events until one satisfies predicate
+    
+    Blocks in select() on the display socket between batches of events
+    
+    Args:
+        display: Open Xlib display
+        predicate: Called with each event; True ends the wait
+        timeout: Seconds to wait at most
+    
+    Returns:
+        True if an event matched, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        while display.pending_events():
+            if predicate(display.next_event()):
+                return True
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([display.fileno()], [], [], remaining)[0]:
+            return False
+
+
+def wait_for_map_event(display, timeout):
+    """
+    Block until a window is mapped or the client list changes, or timeout
+    
+    The root window must select SubstructureNotify and PropertyChange
+    """
+    client_list = display.get_atom('_NET_CLIENT_LIST')
+    return wait_for_event(
+        display,
+        lambda ev: ev.type == X.MapNotify or (ev.type == X.PropertyNotify and ev.atom == client_list),
+        timeout
+    )
+
+
+def wait_for_expose(display, windows, timeout):
+    """Block until one of windows is exposed, or timeout"""
+    ids = {window.id for window in windows}
+    return wait_for_event(
+        display,
+        lambda ev: ev.type == X.Expose and ev.window.id in ids,
+        timeout
+    )
+
+
+def reap(proc, timeout=2.0):
+    """
+    Terminate proc and block until it has exited, killing it after timeout
+    
+    Waits on a pidfd so it wakes the moment the child exits; Popen.wait()
+    then collects the status so the Popen object stays consistent
+    
+    Args:
+        proc: subprocess.Popen of the child
+        timeout: Seconds to wait after SIGTERM before SIGKILL
+    """
+    if proc.poll() is not None:
+        return
+    
+    try:
+        pidfd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        # Not Linux 5.3+ / Python 3.9+
+        pidfd = None
+    
+    proc.terminate()
+    if pidfd is None:
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    else:
+        try:
+            if not select.select([pidfd], [], [], timeout)[0]:
+                proc.kill()
+        finally:
+            os.close(pidfd)
+    proc.wait()